@@ -0,0 +1,148 @@
+import glob
+import mmap
+import os
+import struct
+import sys
+import setting as sg
+from collections.abc import Sequence
+from read_file import read_deck_file
+
+# ファイルの先頭(識別子, 形式の版, 予約, 変換元の更新時刻(ナノ秒), 変換元の大きさ, 要素数, 品詞の数, 文字列領域の大きさ)
+HEADER = struct.Struct('<4sHHQQIII')
+MAGIC = b'PGDK'
+VERSION = 1
+# 品詞の表の1件(文字列領域での開始位置, 終了位置)
+PART_RECORD = struct.Struct('<II')
+# オフセット表の1件(単語の開始位置, 意味の開始位置, 意味の終了位置, 品詞の番号)
+# 単語の終了位置は意味の開始位置と同じ
+ENTRY_RECORD = struct.Struct('<IIIH')
+
+
+def write_binary_deck(entries, bin_file, source_key=(0, 0)):
+    """
+    (単語, 品詞, 意味)の並びをバイナリ形式の単語帳に書き出す関数
+    書き終わってから置き換えるので、読み込み中の他のプロセスが途中のファイルを見ることはない
+
+    :param entries: (単語, 品詞, 意味)の並び
+    :param bin_file: 書き出すパス
+    :param source_key: 変換元のテキストファイルの(更新時刻(ナノ秒), 大きさ)
+    """
+    blob = bytearray()
+    part_index = {}
+    part_records = []
+    entry_records = []
+    for word, part, meaning in entries:
+        if part not in part_index:
+            encoded = part.encode('utf-8')
+            part_index[part] = len(part_records)
+            part_records.append((len(blob), len(blob) + len(encoded)))
+            blob += encoded
+        word_start = len(blob)
+        blob += word.encode('utf-8')
+        meaning_start = len(blob)
+        blob += meaning.encode('utf-8')
+        entry_records.append((word_start, meaning_start, len(blob), part_index[part]))
+    os.makedirs(os.path.dirname(bin_file) or '.', exist_ok=True)
+    temp_file = f'{bin_file}.{os.getpid()}.tmp'
+    with open(temp_file, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, source_key[0], source_key[1],
+                            len(entry_records), len(part_records), len(blob)))
+        for record in part_records:
+            f.write(PART_RECORD.pack(*record))
+        for record in entry_records:
+            f.write(ENTRY_RECORD.pack(*record))
+        f.write(blob)
+    os.replace(temp_file, bin_file)
+
+
+def get_binary_deck_path(binary_dir, name, source_key):
+    """
+    バイナリ形式の単語帳のパスを返す関数
+    変換元が変わるたびに別のファイルに書き出すので、mmapで開いているファイルを置き換えることはない
+
+    :param binary_dir: バイナリ形式の単語帳のディレクトリ
+    :param name: 単語帳の名前('easy'など)
+    :param source_key: 変換元のテキストファイルの(更新時刻(ナノ秒), 大きさ)
+    :return: パス
+    """
+    return os.path.join(binary_dir, f'{name}-{source_key[0]}-{source_key[1]}.deck')
+
+
+def convert_deck(txt_file, bin_file):
+    """
+    テキスト形式の単語帳をバイナリ形式に変換する関数
+
+    :param txt_file: 変換元の単語帳のパス
+    :param bin_file: 書き出すパス
+    """
+    stat = os.stat(txt_file)
+    write_binary_deck(read_deck_file(txt_file), bin_file, (stat.st_mtime_ns, stat.st_size))
+
+
+class BinaryDeck(Sequence):
+    """
+    バイナリ形式の単語帳をmmapで開き、要素を取り出す時に初めて文字列に変換するクラス
+    ファイルのページはOSが同じ単語帳を開いた他のプロセスと共有する
+    i番目の要素は(単語, 品詞, 意味)のタプルとして取り出せる
+    """
+
+    def __init__(self, bin_file):
+        """
+        :param bin_file: バイナリ形式の単語帳のパス
+        """
+        with open(bin_file, 'rb') as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self.read_header(bin_file)
+        except ValueError:
+            # 壊れたファイルはmmapを閉じてから知らせる
+            self.buffer.close()
+            raise
+
+    def read_header(self, bin_file):
+        """ ヘッダーと品詞の表を読み込むメソッド(形式が正しくなければValueErrorを発生させる) """
+        if len(self.buffer) < HEADER.size:
+            raise ValueError(f'{bin_file}: too short for a binary deck')
+        (magic, version, _, source_mtime_ns, source_size,
+         self.count, part_count, blob_size) = HEADER.unpack_from(self.buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'{bin_file}: not a binary deck of version {VERSION}')
+        # 変換元のテキストファイルの(更新時刻(ナノ秒), 大きさ)
+        self.source_key = (source_mtime_ns, source_size)
+        self.entry_offset = HEADER.size + part_count * PART_RECORD.size
+        self.blob_offset = self.entry_offset + self.count * ENTRY_RECORD.size
+        if len(self.buffer) != self.blob_offset + blob_size:
+            raise ValueError(f'{bin_file}: size does not match its header')
+        # 品詞は種類が少ないので開いた時にまとめて文字列にする
+        self.parts = []
+        for i in range(part_count):
+            start, end = PART_RECORD.unpack_from(self.buffer, HEADER.size + i * PART_RECORD.size)
+            self.parts.append(sys.intern(self.decode(start, end)))
+
+    def decode(self, start, end):
+        """ 文字列領域の指定した範囲をUTF-8の文字列に変換するメソッド """
+        return self.buffer[self.blob_offset + start:self.blob_offset + end].decode('utf-8')
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.count))]
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError('binary deck index out of range')
+        word_start, meaning_start, meaning_end, part_id = ENTRY_RECORD.unpack_from(
+            self.buffer, self.entry_offset + index * ENTRY_RECORD.size)
+        return (self.decode(word_start, meaning_start), self.parts[part_id],
+                self.decode(meaning_start, meaning_end))
+
+
+if __name__ == '__main__':
+    # vocabulary/*.txtをすべてバイナリ形式に変換する
+    for txt_path in glob.glob(os.path.join('vocabulary', '*.txt')):
+        name = os.path.splitext(os.path.basename(txt_path))[0]
+        stat = os.stat(txt_path)
+        convert_deck(txt_path, get_binary_deck_path(sg.BINARY_DECK_DIR, name,
+                                                    (stat.st_mtime_ns, stat.st_size)))
@@ -1,10 +1,38 @@
+from abc import ABC, abstractmethod
 import setting as sg
 import pygame
+from dirty_rect import DirtyRectTracker
+from text_cache import render_text
+from font_registry import get_font
+from scaling import VIEWPORT
 
+# ボタンの状態
+BUTTON_STATES = ('normal', 'hover', 'disabled')
 
-class BaseButton:
+# 倍率をキーにした、同じ見た目のボタンで共有する状態ごとに描画済みのサーフェス
+# (保持するのは現在の倍率の分だけ)
+BUTTON_SKINS = {}
+
+
+def get_disabled_color(color):
+    """ 無効状態のボタンの色(元の色を白に近づけた色)を返す関数 """
+    return tuple((c + 255) // 2 for c in color)
+
+
+def get_button_skins():
+    """ 現在の倍率のボタンの見た目を返す関数(倍率が変わっていれば前の倍率の見た目を破棄する) """
+    if VIEWPORT.scale not in BUTTON_SKINS:
+        BUTTON_SKINS.clear()
+        BUTTON_SKINS[VIEWPORT.scale] = {}
+    return BUTTON_SKINS[VIEWPORT.scale]
+
+
+class BaseButton(DirtyRectTracker, ABC):
     """  各種ボタンのベースとなるBaseButtonクラス """
 
+    # ホバーはEventRouterから通知されるので、クリックだけを受け取る
+    EVENT_TYPES = (pygame.MOUSEBUTTONDOWN,)
+
     def __init__(self, pos, button_size, text,
                  color, hover_color, font_size, font_color, on_click, sound_player):
         """
@@ -18,61 +46,129 @@ class BaseButton:
         :param on_click: コールバック関数
         :param sound_player: sound_playerインスタンス変数
         """
-        self.x = pos[0]
-        self.y = pos[1]
-        self.width = button_size[0]
-        self.height = button_size[1]
-        self.rect = pygame.Rect(self.x, self.y, self.width, self.height)
+        super().__init__()
+        # settingsに書かれた(論理解像度での)位置・大きさ・文字の大きさ
+        self.logical_pos = tuple(pos)
+        self.logical_size = tuple(button_size)
+        self.logical_font_size = font_size
         self.text = text
         self.color = color
         self.hover_color = hover_color
         self.on_click = on_click
-        # 日本語フォントを使用する場合、フォントファイルのパスを指定する
-        self.font = pygame.font.Font(sg.FONT_FILE_PATH, font_size)
         self.font_color = font_color
         # ボタンがホバー状態かどうか判定するフラグ
         self.is_hovered = False
-        self.current_color = self.color
+        # 状態ごとに描画済みのサーフェス(初めて描画する時に用意する)
+        self.skins = None
         self.is_event = True
         self.is_draw = True
         # SoundPlayerクラスのインスタンス変数
         self.sound_player = sound_player
+        self.relayout()
 
-    def select_color(self):
+    def relayout(self):
+        """ 現在の倍率に合わせて位置・大きさ・文字の大きさを計算し直すメソッド """
+        self.rect = VIEWPORT.scale_rect(self.logical_pos, self.logical_size)
+        self.x = self.rect.x
+        self.y = self.rect.y
+        self.width = self.rect.width
+        self.height = self.rect.height
+        # 日本語フォントを使用する場合、フォントファイルのパスを指定する
+        self.font_size = VIEWPORT.scale_font_size(self.logical_font_size)
+        self.font = get_font(sg.FONT_FILE_PATH, self.font_size)
+        # 倍率ごとの見た目は共有キャッシュから取り直す(前の倍率の見た目はここで破棄される)
+        get_button_skins()
+        self.skins = None
+
+    def is_static(self):
+        """ ホバーしていない間は静的レイヤーに焼き込んだ見た目と同じ """
+        return not self.is_hovered
+
+    def get_state(self):
+        """ 現在のボタンの状態を返すメソッド """
+        if not self.is_event:
+            return 'disabled'
+        if self.is_hovered:
+            return 'hover'
+        return 'normal'
+
+    def get_state_color(self, state):
         """
-        ボタンの色を設定
+        状態に応じたボタンの色を返すメソッド
+        :param state: ボタンの状態
+        """
+        if state == 'disabled':
+            return get_disabled_color(self.color)
+        if state == 'hover' and self.hover_color is not None:
+            return self.hover_color
+        return self.color
+
+    def get_skin_key(self):
+        """ 見た目が同じボタンで共通になるキーを返すメソッド """
+        return (type(self).__name__, self.width, self.height, self.text,
+                self.color, self.hover_color, self.font_size, self.font_color)
+
+    def get_skins(self):
+        """ 状態ごとに描画済みのサーフェスを返すメソッド(同じ見た目のボタンと共有する) """
+        if self.skins is None:
+            key = self.get_skin_key()
+            button_skins = get_button_skins()
+            if key not in button_skins:
+                button_skins[key] = {state: self.render_skin(state) for state in BUTTON_STATES}
+            self.skins = button_skins[key]
+        return self.skins
+
+    @abstractmethod
+    def render_skin(self, state):
         """
-        if self.is_hovered and self.hover_color is not None:
-            self.current_color = self.hover_color
+        指定された状態のボタンを描画したサーフェスを返すメソッド(サブクラスで実装する)
+        :param state: ボタンの状態
+        """
+
+    def draw(self, screen):
+        """ 描画処理メソッド """
+        if self.is_draw:
+            screen.blit(self.get_skins()[self.get_state()], self.get_rect())
         else:
-            self.current_color = self.color
+            pass
 
-    def draw_button(self, screen):
-        self.select_color()
-        # ボタンの背景を描画
-        pygame.draw.rect(screen, self.current_color, self.rect)
+    def draw_button(self, surface, rect, color):
+        """
+        ボタンの背景を描画するメソッド
+        :param surface: 描画先のサーフェス
+        :param rect: ボタンの位置と大きさ
+        :param color: ボタンの色
+        """
+        pygame.draw.rect(surface, color, rect)
 
-    def draw_text(self, screen):
+    def draw_text(self, surface, rect):
         """
         ボタン上にテキストを描画するメソッド
 
-        :param screen: ウィンドウサイズ
+        :param surface: 描画先のサーフェス
+        :param rect: ボタンの位置と大きさ
         :return: None
         """
-        text_surface = self.font.render(self.text, True, self.font_color)
-        text_rect = text_surface.get_rect(center=self.rect.center)
-        screen.blit(text_surface, text_rect)
-
-    def judge_is_hovered(self, event):
-        if event.type == pygame.MOUSEMOTION:
-            # マウスがボタンの上に乗ったかどうかを判定
-            if self.rect.collidepoint(pygame.mouse.get_pos()):
-                if not self.is_hovered:
-                    self.is_hovered = True
-                    # ホバー音を鳴らす
-                    self.sound_player.play_sound('button_hover_sound')
-            else:
-                self.is_hovered = False
+        text_surface = render_text(sg.FONT_FILE_PATH, self.font_size, self.text, True, self.font_color)
+        text_rect = text_surface.get_rect(center=rect.center)
+        surface.blit(text_surface, text_rect)
+
+    def get_hit_rect(self):
+        """ クリックできる領域を返すメソッド """
+        return self.rect
+
+    def set_hovered(self, is_hovered):
+        """
+        マウスがボタンに乗った・離れた時に呼ばれるメソッド
+        :param is_hovered: マウスがボタンの上にあるかどうか
+        """
+        if self.is_hovered == is_hovered:
+            return
+        self.is_hovered = is_hovered
+        self.mark_dirty()
+        if is_hovered:
+            # ホバー音を鳴らす
+            self.sound_player.play_sound('button_hover_sound')
 
     def judge_on_click(self, event):
         if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
@@ -84,16 +180,28 @@ class BaseButton:
                 self.on_click()
 
     def is_event_true(self):
-        self.is_event = True
+        if not self.is_event:
+            self.is_event = True
+            self.mark_changed()
+            self.notify_input_changed()
 
     def is_event_false(self):
-        self.is_event = False
+        if self.is_event:
+            self.is_event = False
+            self.mark_changed()
+            self.notify_input_changed()
 
     def is_draw_true(self):
-        self.is_draw = True
+        if not self.is_draw:
+            self.is_draw = True
+            self.mark_changed()
+            self.notify_input_changed()
 
     def is_draw_false(self):
-        self.is_draw = False
+        if self.is_draw:
+            self.is_draw = False
+            self.mark_changed()
+            self.notify_input_changed()
 
 
 class Button(BaseButton):
@@ -114,18 +222,24 @@ class Button(BaseButton):
                          color, hover_color,
                          font_size, font_color, on_click, sound_player)
 
-    def draw(self, screen):
-        """ 描画処理メソッド """
-        if self.is_draw:
-            self.draw_button(screen)
-            self.draw_text(screen)
-        else:
-            pass
+    def is_input_enabled(self):
+        """ イベント処理が有効な間だけ操作を受け付ける """
+        return self.is_event
+
+    def render_skin(self, state):
+        """
+        指定された状態のボタンを描画したサーフェスを返すメソッド
+        :param state: ボタンの状態
+        """
+        surface = pygame.Surface((self.width, self.height)).convert()
+        button_rect = surface.get_rect()
+        self.draw_button(surface, button_rect, self.get_state_color(state))
+        self.draw_text(surface, button_rect)
+        return surface
 
     def handle_event(self, event):
         """ イベント処理メソッド """
         if self.is_event:
-            self.judge_is_hovered(event)
             self.judge_on_click(event)
         else:
             pass
@@ -149,39 +263,79 @@ class ArrowButton(BaseButton):
                          color, hover_color,
                          font_size, font_color, on_click, sound_player)
 
-    def draw(self, screen):
-        """ 描画処理メソッド """
-        if self.is_draw:
-            self.create_left_arrow(screen)
-            self.draw_text(screen)
-        else:
-            pass
+    def is_input_enabled(self):
+        """ 表示されている間だけ操作を受け付ける """
+        return self.is_draw
 
     def handle_event(self, event):
         """ イベント処理メソッド """
         if self.is_draw:
-            self.judge_is_hovered(event)
             self.judge_on_click(event)
         else:
             pass
 
-    def create_left_arrow(self, screen):
-        """
-        左向き矢印を作成するメソッド
-        :param screen: ウィンドウサイズ
-        """
-        self.draw_button(screen)
+    def get_arrow_points(self):
+        """ 左向き矢印の頂点座標を返すメソッド """
+        # 形は論理解像度で決めてからウィンドウ座標に変換する
+        x, y = self.logical_pos
+        height = self.logical_size[1]
         # 大きさ
-        arrow_size = self.y + 10
+        arrow_size = y + 10
         # x座標
-        arrow_x = self.x - 30
+        arrow_x = x - 30
         # y座標
-        arrow_y = self.y + (self.height - arrow_size) // 2
+        arrow_y = y + (height - arrow_size) // 2
+        # 頂点座標
+        return [VIEWPORT.scale_pos(point) for point in
+                [(arrow_x, arrow_y + arrow_size // 2), (arrow_x + arrow_size, arrow_y),
+                 (arrow_x + arrow_size, arrow_y + arrow_size)]]
+
+    def get_rect(self):
+        """ 矢印を含めた描画領域を返すメソッド """
+        arrow_points = self.get_arrow_points()
+        xs = [x for x, _ in arrow_points]
+        ys = [y for _, y in arrow_points]
+        arrow_rect = pygame.Rect(min(xs), min(ys), max(xs) - min(xs) + 1, max(ys) - min(ys) + 1)
+        return self.rect.union(arrow_rect)
+
+    def get_skin_key(self):
+        """ 矢印の形も含めた、見た目が同じボタンで共通になるキーを返すメソッド """
+        skin_rect = self.get_rect()
+        return super().get_skin_key() + (self.get_local_rect(skin_rect).topleft,
+                                         tuple(self.get_local_arrow_points(skin_rect)))
+
+    def get_local_rect(self, skin_rect):
+        """ サーフェス内でのボタンの位置を返すメソッド """
+        return self.rect.move(-skin_rect.x, -skin_rect.y)
+
+    def get_local_arrow_points(self, skin_rect):
+        """ サーフェス内での矢印の頂点座標を返すメソッド """
+        return [(x - skin_rect.x, y - skin_rect.y) for x, y in self.get_arrow_points()]
+
+    def render_skin(self, state):
+        """
+        指定された状態のボタンを描画したサーフェスを返すメソッド
+        :param state: ボタンの状態
+        """
+        skin_rect = self.get_rect()
+        surface = pygame.Surface(skin_rect.size, pygame.SRCALPHA).convert_alpha()
+        button_rect = self.get_local_rect(skin_rect)
+        self.create_left_arrow(surface, skin_rect, self.get_state_color(state))
+        self.draw_text(surface, button_rect)
+        return surface
+
+    def create_left_arrow(self, surface, skin_rect, color):
+        """
+        左向き矢印を作成するメソッド
+        :param surface: 描画先のサーフェス
+        :param skin_rect: サーフェスの画面上の位置と大きさ
+        :param color: ボタンの色
+        """
+        self.draw_button(surface, self.get_local_rect(skin_rect), color)
         # 頂点座標
-        arrow_points = [(arrow_x, arrow_y + arrow_size // 2), (arrow_x + arrow_size, arrow_y),
-                        (arrow_x + arrow_size, arrow_y + arrow_size)]
+        arrow_points = self.get_local_arrow_points(skin_rect)
         # 左向き矢印を描画
-        pygame.draw.polygon(screen, self.current_color, arrow_points)
+        pygame.draw.polygon(surface, color, arrow_points)
 
 
 if __name__ == '__main__':
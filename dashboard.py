@@ -0,0 +1,224 @@
+from abc import ABC, abstractmethod
+import numpy as np
+import pygame
+import setting as sg
+from dirty_rect import DirtyRectTracker
+from text_cache import render_text
+from scaling import VIEWPORT
+
+
+def get_part_name(part):
+    """ 品詞の表記('【動詞／名詞】'など)から最初の品詞の名前を返す関数 """
+    return part.strip('【】').split('／')[0]
+
+
+def compute_statistics(answer_log):
+    """
+    回答記録から集計結果をまとめて計算する関数
+
+    :param answer_log: (品詞, 正解したかどうか, 回答にかかった秒数)のリスト
+    :return: 集計結果の辞書
+    """
+    parts = np.array([get_part_name(part) for part, _, _ in answer_log], dtype=str)
+    corrects = np.array([is_correct for _, is_correct, _ in answer_log], dtype=np.float64)
+    response_times = np.array([response_time for _, _, response_time in answer_log], dtype=np.float64)
+    # 何問目までの正答率(%)
+    accuracy = np.cumsum(corrects) / np.arange(1, len(corrects) + 1) * 100
+    # 品詞ごとの正答率(%)
+    part_names, part_index = np.unique(parts, return_inverse=True)
+    part_counts = np.bincount(part_index, minlength=len(part_names))
+    part_accuracy = np.bincount(part_index, weights=corrects, minlength=len(part_names)) \
+        / np.maximum(part_counts, 1) * 100
+    # 回答時間の分布
+    max_time = max(float(np.ceil(response_times.max())), 1.0) if len(response_times) else 1.0
+    time_counts, time_edges = np.histogram(response_times, bins=sg.DASHBOARD_HISTOGRAM_BINS,
+                                           range=(0, max_time))
+    return {
+        'accuracy': accuracy,
+        'part_names': list(part_names),
+        'part_accuracy': part_accuracy,
+        'time_counts': time_counts,
+        'time_edges': time_edges,
+    }
+
+
+def rasterize_line(values, width, height, max_value, color):
+    """
+    折れ線グラフを(width, height, 3)の配列に描画する関数
+    各列の値を補間し、線より下を薄く塗る
+
+    :param values: 値の配列
+    :param width: 幅
+    :param height: 高さ
+    :param max_value: 上端に対応する値
+    :param color: 線の色
+    :return: ピクセルの配列
+    """
+    pixels = np.empty((width, height, 3), dtype=np.uint8)
+    pixels[:] = sg.DASHBOARD_BACKGROUND_COLOR
+    if len(values) == 0:
+        return pixels
+    # 列ごとの値(1問だけの場合は水平な線)
+    columns = np.interp(np.linspace(0, len(values) - 1, width), np.arange(len(values)), values)
+    line_y = (height - 1) - columns / max_value * (height - 1)
+    ys = np.arange(height)[np.newaxis, :]
+    fill_color = (np.array(color) + np.array(sg.DASHBOARD_BACKGROUND_COLOR) * 3) // 4
+    pixels[ys >= line_y[:, np.newaxis]] = fill_color
+    # 隣の列との間の縦方向もつなげて線にする
+    previous_y = np.concatenate((line_y[:1], line_y[:-1]))
+    line_top = np.minimum(previous_y, line_y) - sg.DASHBOARD_LINE_WIDTH / 2
+    line_bottom = np.maximum(previous_y, line_y) + sg.DASHBOARD_LINE_WIDTH / 2
+    pixels[(ys >= line_top[:, np.newaxis]) & (ys <= line_bottom[:, np.newaxis])] = color
+    return pixels
+
+
+def rasterize_bars(values, width, height, max_value, color):
+    """
+    棒グラフを(width, height, 3)の配列に描画する関数
+
+    :param values: 棒ごとの値の配列
+    :param width: 幅
+    :param height: 高さ
+    :param max_value: 上端に対応する値
+    :param color: 棒の色
+    :return: ピクセルの配列
+    """
+    pixels = np.empty((width, height, 3), dtype=np.uint8)
+    pixels[:] = sg.DASHBOARD_BACKGROUND_COLOR
+    if len(values) == 0:
+        return pixels
+    # 各列がどの棒のどの位置にあたるか
+    column_position = np.arange(width) * len(values) / width
+    bar_index = column_position.astype(np.int64)
+    in_bar = (column_position - bar_index) < sg.DASHBOARD_BAR_RATIO
+    bar_top = (height - np.asarray(values, dtype=np.float64)[bar_index] / max_value * height)
+    ys = np.arange(height)[np.newaxis, :]
+    pixels[in_bar[:, np.newaxis] & (ys >= bar_top[:, np.newaxis])] = color
+    return pixels
+
+
+class BaseChart(DirtyRectTracker, ABC):
+    """ 見出し付きのグラフを表示する部品のベースとなるクラス """
+
+    def __init__(self, title, position, chart_size, font_size, color, labels=()):
+        """
+        :param title: 見出し
+        :param position: 描画位置(x, y)
+        :param chart_size: 見出しと目盛りを含めた大きさ(width, height)
+        :param font_size: 見出しの文字の大きさ
+        :param color: グラフの色
+        :param labels: グラフの下に等間隔に並べる目盛りの文字列
+        """
+        super().__init__()
+        self.title = title
+        self.logical_position = tuple(position)
+        self.logical_size = tuple(chart_size)
+        self.logical_font_size = font_size
+        self.color = color
+        self.labels = list(labels)
+        self.relayout()
+
+    def relayout(self):
+        """ 現在の倍率に合わせた大きさでグラフを描画し直すメソッド """
+        self.rect = VIEWPORT.scale_rect(self.logical_position, self.logical_size)
+        self.font_size = VIEWPORT.scale_font_size(self.logical_font_size)
+        self.label_font_size = VIEWPORT.scale_font_size(sg.DASHBOARD_LABEL_FONT_SIZE)
+        self.surface = self.render()
+
+    def render(self):
+        """ 見出し・グラフ・目盛りを1枚のサーフェスに描画するメソッド """
+        surface = pygame.Surface(self.rect.size).convert()
+        surface.fill(sg.WHITE)
+        title = render_text(sg.FONT_FILE_PATH, self.font_size, self.title, True, sg.BLACK)
+        surface.blit(title, (0, 0))
+        label_height = 0
+        rendered_labels = [render_text(sg.FONT_FILE_PATH, self.label_font_size, label, True, sg.BLACK)
+                           for label in self.labels]
+        if rendered_labels:
+            label_height = max(label.get_height() for label in rendered_labels)
+        plot_rect = pygame.Rect(0, title.get_height(), self.rect.width,
+                                self.rect.height - title.get_height() - label_height)
+        if plot_rect.width > 0 and plot_rect.height > 0:
+            # グラフ本体はNumPyの配列として描画してまとめて転送する
+            plot = pygame.Surface(plot_rect.size).convert()
+            pygame.surfarray.blit_array(plot, self.rasterize(plot_rect.width, plot_rect.height))
+            surface.blit(plot, plot_rect)
+        # 目盛りは各棒の中央に置く
+        for i, label in enumerate(rendered_labels):
+            center_x = (i + sg.DASHBOARD_BAR_RATIO / 2) * self.rect.width / len(rendered_labels)
+            surface.blit(label, label.get_rect(midtop=(center_x, plot_rect.bottom)))
+        return surface
+
+    def set_data(self, values, max_value, labels=()):
+        """
+        表示する値を入れ替えて描画し直すメソッド
+
+        :param values: 値の配列
+        :param max_value: 上端に対応する値
+        :param labels: グラフの下に等間隔に並べる目盛りの文字列
+        """
+        self.values = values
+        self.max_value = max_value
+        self.labels = list(labels)
+        self.surface = self.render()
+        self.mark_changed()
+
+    @abstractmethod
+    def rasterize(self, width, height):
+        """ グラフ本体を(width, height, 3)の配列に描画するメソッド(サブクラスで実装する) """
+
+    def is_static(self):
+        """ 内容は変わらないので静的レイヤーに焼き込める """
+        return True
+
+    def draw(self, screen):
+        """ 描画処理を行うメソッド """
+        screen.blit(self.surface, self.rect)
+
+    def handle_event(self, event):
+        pass
+
+
+class LineChart(BaseChart):
+    def __init__(self, title, values, max_value, position, chart_size, font_size, color):
+        """
+        :param title: 見出し
+        :param values: 値の配列
+        :param max_value: 上端に対応する値
+        :param position: 描画位置(x, y)
+        :param chart_size: 見出しを含めた大きさ(width, height)
+        :param font_size: 見出しの文字の大きさ
+        :param color: 線の色
+        """
+        self.values = values
+        self.max_value = max_value
+        super().__init__(title, position, chart_size, font_size, color)
+
+    def rasterize(self, width, height):
+        """ 折れ線グラフを配列に描画するメソッド """
+        return rasterize_line(self.values, width, height, self.max_value, self.color)
+
+
+class BarChart(BaseChart):
+    def __init__(self, title, values, max_value, labels, position, chart_size, font_size, color):
+        """
+        :param title: 見出し
+        :param values: 棒ごとの値の配列
+        :param max_value: 上端に対応する値
+        :param labels: 棒ごとの目盛りの文字列
+        :param position: 描画位置(x, y)
+        :param chart_size: 見出しと目盛りを含めた大きさ(width, height)
+        :param font_size: 見出しの文字の大きさ
+        :param color: 棒の色
+        """
+        self.values = values
+        self.max_value = max_value
+        super().__init__(title, position, chart_size, font_size, color, labels)
+
+    def rasterize(self, width, height):
+        """ 棒グラフを配列に描画するメソッド """
+        return rasterize_bars(self.values, width, height, self.max_value, self.color)
+
+
+if __name__ == '__main__':
+    pass
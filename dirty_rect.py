@@ -0,0 +1,88 @@
+import pygame
+
+
+def merge_rects(rects):
+    """
+    重なり合う矩形をまとめるメソッド
+
+    :param rects: 矩形のリスト
+    :return: 互いに重ならない矩形のリスト
+    """
+    merged = []
+    for rect in rects:
+        rect = pygame.Rect(rect)
+        if rect.width <= 0 or rect.height <= 0:
+            continue
+        # 重なる矩形がなくなるまで結合を繰り返す
+        index = rect.collidelist(merged)
+        while index != -1:
+            rect.union_ip(merged.pop(index))
+            index = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
+
+
+class DirtyRectTracker:
+    """ 描画内容が変化した領域(ダーティ矩形)を記録するクラス """
+
+    # 受け取るイベントの種類(EventRouterはこの種類のイベントだけを渡す)
+    EVENT_TYPES = ()
+
+    def __init__(self):
+        # 前回の描画以降に変化した領域のリスト
+        self.dirty_rects = []
+        # 内容(ホバー以外の見た目)が変化したかどうかのフラグ
+        self.is_changed = False
+        # イベントを振り分けているEventRouter(登録されていない場合はNone)
+        self.router = None
+
+    def get_rect(self):
+        """ 現在の描画領域を返すメソッド(描画領域がself.rect以外のサブクラスは上書きする) """
+        return self.rect
+
+    def is_static(self):
+        """ 画面の静的レイヤーに焼き込める見た目かどうかを返すメソッド """
+        return False
+
+    def get_hit_rect(self):
+        """ マウスで操作できる領域を返すメソッド(マウスで操作しない部品はNone) """
+        return None
+
+    def is_input_enabled(self):
+        """ 現在イベントを受け付けるかどうかを返すメソッド """
+        return True
+
+    def notify_input_changed(self):
+        """ イベントを受け付けるかどうかが変わったことをEventRouterに知らせるメソッド """
+        if self.router is not None:
+            self.router.invalidate()
+
+    def set_hovered(self, is_hovered):
+        """
+        マウスが領域に入った・出た時に呼ばれるメソッド
+        :param is_hovered: マウスが領域の上にあるかどうか
+        """
+        pass
+
+    def relayout(self):
+        """ ウィンドウの大きさが変わった時に描画位置・大きさを計算し直すメソッド """
+        pass
+
+    def mark_dirty(self):
+        """ 現在の描画領域をダーティ矩形として記録するメソッド """
+        self.dirty_rects.append(self.get_rect())
+
+    def mark_changed(self):
+        """ 内容が変化したことを記録するメソッド(静的レイヤーの作り直しが必要になる) """
+        self.is_changed = True
+        self.mark_dirty()
+
+    def pop_dirty_rects(self):
+        """ 記録したダーティ矩形を返し、記録をクリアするメソッド """
+        dirty_rects = self.dirty_rects
+        self.dirty_rects = []
+        return dirty_rects
+
+
+if __name__ == '__main__':
+    pass
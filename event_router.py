@@ -0,0 +1,90 @@
+import pygame
+import setting as sg
+from hit_test import HitTestGrid
+
+# マウスの位置に応じて渡す先を決めるイベント
+POINTER_EVENTS = (pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.MOUSEWHEEL)
+
+
+class EventRouter:
+    """
+    部品が受け取るイベントの種類(EVENT_TYPES)ごとに渡す先の表を作り、イベントを振り分けるクラス
+    一番上のレイヤーの部品だけがイベントを受け取る(オーバーレイを開くとレイヤーを積む)
+    """
+
+    def __init__(self, parts):
+        """
+        :param parts: 一番下のレイヤー(画面)の部品のリスト
+        """
+        self.layers = []
+        # イベントの種類をキーにした、イベントを渡す部品のリスト(作り直しが必要な場合はNone)
+        self.tables = None
+        # マウスで操作できる部品の当たり判定
+        self.hit_grid = HitTestGrid(sg.HIT_TEST_CELL_SIZE)
+        # マウスが乗っている部品のリスト
+        self.hovered_parts = []
+        self.push_layer(parts)
+
+    def push_layer(self, parts):
+        """
+        レイヤーを積み、その部品だけにイベントを渡すようにするメソッド
+        :param parts: レイヤーの部品のリスト
+        """
+        for part in parts:
+            part.router = self
+        self.layers.append(list(parts))
+        self.rebuild()
+
+    def pop_layer(self):
+        """ 一番上のレイヤーを取り除くメソッド """
+        self.layers.pop()
+        self.rebuild()
+
+    def invalidate(self):
+        """ 部品の有効・無効や配置が変わった時に、次のイベントで表を作り直させるメソッド """
+        self.tables = None
+
+    def rebuild(self):
+        """ 一番上のレイヤーの有効な部品から、振り分け表と当たり判定を作り直すメソッド """
+        parts = [part for part in self.layers[-1] if part.is_input_enabled()]
+        self.tables = {}
+        for part in parts:
+            for event_type in part.EVENT_TYPES:
+                self.tables.setdefault(event_type, []).append(part)
+        self.hit_grid.rebuild(parts)
+        # 無効になった部品・下のレイヤーの部品のホバーを外す
+        self.update_hover([part for part in self.hovered_parts if part in parts])
+
+    def update_hover(self, hit_parts):
+        """
+        マウスが乗った部品・離れた部品に通知するメソッド
+        :param hit_parts: 現在マウスの下にある部品のリスト
+        """
+        for part in self.hovered_parts:
+            if part not in hit_parts:
+                part.set_hovered(False)
+        for part in hit_parts:
+            if part not in self.hovered_parts:
+                part.set_hovered(True)
+        self.hovered_parts = hit_parts
+
+    def dispatch(self, event):
+        """ イベントを受け取る部品だけに渡すメソッド """
+        if self.tables is None:
+            self.rebuild()
+        if event.type in POINTER_EVENTS:
+            # マウスのイベントはマウスの下にある部品だけに渡す
+            # MOUSEWHEELは座標を持たないので現在のマウスの位置を使う
+            pos = event.pos if hasattr(event, 'pos') else pygame.mouse.get_pos()
+            hit_parts = self.hit_grid.query(pos)
+            if event.type == pygame.MOUSEMOTION:
+                self.update_hover(hit_parts)
+            targets = [part for part in hit_parts if event.type in part.EVENT_TYPES]
+        else:
+            targets = self.tables.get(event.type, ())
+        for part in targets:
+            part.handle_event(event)
+
+
+if __name__ == '__main__':
+    pass
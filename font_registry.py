@@ -0,0 +1,88 @@
+import io
+import pygame
+import setting as sg
+from layout import get_all_layouts
+
+
+class FontRegistry:
+    """ (フォントファイル, 文字の大きさ)ごとにFontを1つだけ読み込んで共有するクラス """
+
+    def __init__(self):
+        # フォントファイルのパスをキーにしたファイルの中身
+        self.font_data = {}
+        # (フォントファイル, 文字の大きさ)をキーにしたFont
+        self.fonts = {}
+
+    def get_font(self, font_file, font_size):
+        """
+        共有のFontを返すメソッド(未読み込みの場合は読み込む)
+
+        :param font_file: フォントファイルのパス
+        :param font_size: 文字の大きさ
+        :return: Font
+        """
+        key = (font_file, font_size)
+        font = self.fonts.get(key)
+        if font is None:
+            font = pygame.font.Font(io.BytesIO(self.get_font_data(font_file)), font_size)
+            self.fonts[key] = font
+        return font
+
+    def get_font_data(self, font_file):
+        """ フォントファイルの中身を返すメソッド(ファイルは1度だけ読み込む) """
+        data = self.font_data.get(font_file)
+        if data is None:
+            with open(font_file, 'rb') as f:
+                data = f.read()
+            self.font_data[font_file] = data
+        return data
+
+    def preload(self, font_file, font_sizes):
+        """
+        指定された大きさのFontを事前に読み込むメソッド
+
+        :param font_file: フォントファイルのパス
+        :param font_sizes: 文字の大きさのリスト
+        """
+        for font_size in font_sizes:
+            self.get_font(font_file, font_size)
+
+    def get_stats(self):
+        """
+        読み込み済みのFontの統計情報を返すメソッド
+        各Fontは同じファイルの中身を共有するため、メモリ使用量はファイルごとに数える
+        """
+        return {
+            'faces': len(self.fonts),
+            'sizes': sorted(font_size for _, font_size in self.fonts),
+            'files': len(self.font_data),
+            'file_bytes': sum(len(data) for data in self.font_data.values()),
+        }
+
+
+def get_layout_font_sizes():
+    """ settings/*.txtで使われている文字の大きさを返す関数 """
+    font_sizes = {sg.BUTTON_BACK_FONT_SIZE}
+    for layout in get_all_layouts():
+        for name, value in layout._asdict().items():
+            if name.endswith('_font_size'):
+                font_sizes.add(value)
+    return sorted(font_sizes)
+
+
+# プロセス全体で共有するレジストリ
+FONT_REGISTRY = FontRegistry()
+
+
+def get_font(font_file, font_size):
+    """ 共有のFontを返す関数 """
+    return FONT_REGISTRY.get_font(font_file, font_size)
+
+
+def preload_layout_fonts():
+    """ settings/*.txtで使われている大きさのFontを事前に読み込む関数 """
+    FONT_REGISTRY.preload(sg.FONT_FILE_PATH, get_layout_font_sizes())
+
+
+if __name__ == '__main__':
+    pass
@@ -1,6 +1,7 @@
 import random
+import time
 import setting as sg
-from read_file import read_txt_file
+from vocabulary_store import get_deck
 
 
 def check_value(var, var_name):
@@ -60,18 +61,14 @@ class GameSystem:
         self.questions_list = self.select_difficulty()
         # ランダムに抽出した問題リスト
         self.random_q_list = self.make_random_list()
+        # (品詞, 正解したかどうか, 回答にかかった秒数)を回答順に記録したリスト
+        self.answer_log = []
+        # 現在の問題を出題した時刻
+        self.question_start_time = time.perf_counter()
 
     def select_difficulty(self):
-        """ 選択された難易度に応じてリストを選ぶメソッド """
-        file_name = ''
-        if self.difficulty == 'EASY':
-            file_name = 'vocabulary/easy.txt'
-        elif self.difficulty == 'NORMAL':
-            file_name = 'vocabulary/normal.txt'
-        elif self.difficulty == 'HARD':
-            file_name = 'vocabulary/hard.txt'
-        with open(file_name, encoding='utf-8') as f:
-            return read_txt_file(file_name)
+        """ 選択された難易度に応じて共有の単語帳を選ぶメソッド """
+        return get_deck(self.difficulty)
 
     def get_random_list(self):
         """ random_q_listを返すメソッド """
@@ -134,13 +131,21 @@ class GameSystem:
 
         :param answer: ユーザの回答
         :param current_num: 現在の問題番号
+        :return: 正解ならTrue,不正解ならFalse
         """
+        is_correct = answer == self.get_random_list()[current_num][sg.WORD_NUM]
+        # 回答を記録し、次の問題の時間を測り始める
+        now = time.perf_counter()
+        self.answer_log.append((self.get_random_list()[current_num][sg.PART_NUM], is_correct,
+                                now - self.question_start_time))
+        self.question_start_time = now
         # 正解の場合
-        if answer == self.get_random_list()[current_num][sg.WORD_NUM]:
+        if is_correct:
             # 正解音を鳴らす
             self.sound_player.play_sound('正解')
             # スコアを+1する
             self.add_score()
+            return True
         # 不正解の場合
         else:
             # 不正解音を鳴らす
@@ -152,6 +157,16 @@ class GameSystem:
                 self.sub_life()
             else:
                 pass
+            return False
+
+    def start_timer(self):
+        """ 最初の問題の回答時間を測り始めるメソッド(前もって作った場合は出題する時に呼ぶ) """
+        self.question_start_time = time.perf_counter()
+
+    def get_answer_log(self):
+        """ answer_logを返すメソッド """
+        check_type(self.answer_log, 'self.answer_log', list)
+        return self.answer_log
 
     def practice_flg_true(self):
         self.practice_flg = True
@@ -213,5 +228,22 @@ class PracticeMode(GameSystem):
         return random.sample(self.questions_list, 10)
 
 
+def create_game_system(difficulty, game_mode, sound_player):
+    """
+    ゲームモードに沿ったインスタンスを生成する関数(pygameを使わないので別スレッドからも呼べる)
+
+    :param difficulty: 難易度
+    :param game_mode: ゲームモード
+    :param sound_player: SoundPlayerクラスのインスタンス
+    :return: インスタンス
+    """
+    if game_mode == 'STANDARD':
+        return StandardMode(difficulty, sound_player)
+    elif game_mode == 'PRACTICE':
+        return PracticeMode(difficulty, sound_player)
+    elif game_mode == 'ENDLESS':
+        return EndlessMode(difficulty, sound_player)
+
+
 if __name__ == '__main__':
     pass
@@ -0,0 +1,272 @@
+import ast
+import glob
+import hashlib
+import json
+import os
+import string
+import pygame
+import setting as sg
+from font_registry import get_font
+from layout import get_layout
+from text_cache import TEXT_CACHE, render_text
+
+# アトラスには白で描画し、文字列を組み立てる時に色を付ける
+ATLAS_COLOR = (255, 255, 255)
+# アトラスから組み立てる文字(render_atlas_textを使う部品)の大きさを持つレイアウトの項目
+ATLAS_LAYOUT_FIELDS = (
+    ('GamePlayScreen', 'label_parts_font_size'),
+    ('GamePlayScreen', 'label_question_font_size'),
+)
+
+
+def collect_charset(source_files=('screen.py', 'setting.py'), vocabulary_dir='vocabulary'):
+    """
+    ゲーム中に表示する可能性のある文字の集合を返す関数
+
+    :param source_files: UIの文字列を集めるソースファイル
+    :param vocabulary_dir: 単語帳のディレクトリ
+    :return: 文字を並べた文字列
+    """
+    chars = set(string.ascii_letters + string.digits + string.punctuation + ' ')
+    # ソースファイル中の文字列リテラル(f文字列の固定部分も含む)
+    for file_name in source_files:
+        with open(file_name, encoding='utf-8') as f:
+            tree = ast.parse(f.read())
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Constant) and isinstance(node.value, str):
+                chars.update(node.value)
+    # 単語帳に含まれる文字
+    for file_name in glob.glob(os.path.join(vocabulary_dir, '*.txt')):
+        with open(file_name, encoding='utf-8') as f:
+            chars.update(f.read())
+    return ''.join(sorted(c for c in chars if c.isprintable()))
+
+
+class GlyphAtlas:
+    """ 1つの大きさの文字をまとめて描画したサーフェスと各文字の位置・送り幅を保持するクラス """
+
+    def __init__(self, font_file, font_size, surface, glyphs, line_height):
+        """
+        :param font_file: フォントファイルのパス
+        :param font_size: 文字の大きさ
+        :param surface: 文字を並べて描画したサーフェス
+        :param glyphs: 文字をキーにした(x, y, width, height, 送り幅)
+        :param line_height: 行の高さ
+        """
+        self.font_file = font_file
+        self.font_size = font_size
+        self.surface = surface
+        self.glyphs = glyphs
+        self.line_height = line_height
+        # アトラスにない文字を描画したサーフェスと送り幅
+        self.fallback_glyphs = {}
+        self.misses = 0
+
+    @classmethod
+    def bake(cls, font_file, font_size, charset):
+        """
+        文字の集合をアトラスに描画するメソッド
+
+        :param font_file: フォントファイルのパス
+        :param font_size: 文字の大きさ
+        :param charset: 描画する文字の集合
+        :return: GlyphAtlas
+        """
+        font = get_font(font_file, font_size)
+        line_height = font.get_height()
+        rendered = []
+        for char in charset:
+            glyph_surface = font.render(char, True, ATLAS_COLOR)
+            rendered.append((char, glyph_surface, get_advance(font, char, glyph_surface)))
+        # 横幅が決まった棚に左から順に詰めていく
+        x = 0
+        y = 0
+        glyphs = {}
+        for char, glyph_surface, advance in rendered:
+            width = glyph_surface.get_width()
+            if x + width > sg.GLYPH_ATLAS_WIDTH:
+                x = 0
+                y += line_height
+            glyphs[char] = (x, y, width, glyph_surface.get_height(), advance)
+            x += width
+        surface = pygame.Surface((sg.GLYPH_ATLAS_WIDTH, y + line_height), pygame.SRCALPHA)
+        for char, glyph_surface, _ in rendered:
+            surface.blit(glyph_surface, glyphs[char][:2])
+        return cls(font_file, font_size, surface, glyphs, line_height)
+
+    def get_glyph(self, char):
+        """
+        1文字分の(サーフェス, 切り出す範囲, 送り幅)を返すメソッド
+        アトラスにない文字はpygame.fontで描画して保持する
+        """
+        glyph = self.glyphs.get(char)
+        if glyph is not None:
+            return self.surface, glyph[:4], glyph[4]
+        fallback = self.fallback_glyphs.get(char)
+        if fallback is None:
+            self.misses += 1
+            font = get_font(self.font_file, self.font_size)
+            glyph_surface = font.render(char, True, ATLAS_COLOR)
+            fallback = (glyph_surface, glyph_surface.get_rect(), get_advance(font, char, glyph_surface))
+            self.fallback_glyphs[char] = fallback
+        return fallback
+
+    def render(self, text, color):
+        """
+        アトラスから文字列を組み立てるメソッド
+        組み立てたサーフェスは共有のキャッシュに保持し、同じ文字列では作り直さない
+
+        :param text: 描画する内容
+        :param color: 文字の色
+        :return: 描画済みのサーフェス(共有されるため、変更してはいけない)
+        """
+        key = ('atlas', self.font_file, self.font_size, text, tuple(color))
+        return TEXT_CACHE.get_or_build(key, self.compose, text, color)
+
+    def compose(self, text, color):
+        """
+        アトラスから文字を切り出して文字列を組み立てるメソッド
+
+        :param text: 描画する内容
+        :param color: 文字の色
+        :return: 描画済みのサーフェス
+        """
+        placed = []
+        x = 0
+        width = 0
+        for char in text:
+            glyph_surface, area, advance = self.get_glyph(char)
+            placed.append((glyph_surface, x, area))
+            width = max(width, x + area[2])
+            x += advance
+        surface = pygame.Surface((max(width, 1), self.line_height), pygame.SRCALPHA)
+        for glyph_surface, glyph_x, area in placed:
+            surface.blit(glyph_surface, (glyph_x, 0), area, special_flags=pygame.BLEND_RGBA_MAX)
+        # 白で描画した文字に色を付ける
+        surface.fill(tuple(color[:3]) + (255,), special_flags=pygame.BLEND_RGBA_MULT)
+        return surface
+
+    def save(self, image_path, metrics_path, cache_key):
+        """ アトラスの画像と各文字の情報をファイルに保存するメソッド """
+        os.makedirs(os.path.dirname(image_path), exist_ok=True)
+        pygame.image.save(self.surface, image_path)
+        with open(metrics_path, 'w', encoding='utf-8') as f:
+            json.dump({'key': cache_key, 'line_height': self.line_height, 'glyphs': self.glyphs},
+                      f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, font_file, font_size, image_path, metrics_path, cache_key):
+        """ 保存済みのアトラスを読み込むメソッド(作り直しが必要な場合はNoneを返す) """
+        if not (os.path.exists(image_path) and os.path.exists(metrics_path)):
+            return None
+        with open(metrics_path, encoding='utf-8') as f:
+            metrics = json.load(f)
+        if metrics.get('key') != cache_key:
+            return None
+        surface = pygame.image.load(image_path)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha()
+        glyphs = {char: tuple(glyph) for char, glyph in metrics['glyphs'].items()}
+        return cls(font_file, font_size, surface, glyphs, metrics['line_height'])
+
+
+def get_advance(font, char, glyph_surface):
+    """ 文字の送り幅を返す関数(取得できない場合は描画した幅) """
+    metrics = font.metrics(char)
+    if metrics and metrics[0] is not None:
+        return metrics[0][4]
+    return glyph_surface.get_width()
+
+
+class GlyphAtlasRegistry:
+    """
+    文字の大きさごとのアトラスを共有するクラス
+    アトラスはbuild_allで指定された大きさ(アトラスから組み立てる文字の大きさ)だけ用意し、
+    それ以外の大きさでアトラスを描画・保存することはない
+    """
+
+    def __init__(self, cache_dir):
+        """
+        :param cache_dir: アトラスを保存するディレクトリ
+        """
+        self.cache_dir = cache_dir
+        self.atlases = {}
+        self.charset = None
+
+    def get_charset(self):
+        """ アトラスに描画する文字の集合を返すメソッド """
+        if self.charset is None:
+            self.charset = collect_charset()
+        return self.charset
+
+    def get_cache_key(self, font_file, font_size):
+        """ フォントファイル・大きさ・文字の集合から保存済みアトラスの有効性を判定するキーを返すメソッド """
+        stat = os.stat(font_file)
+        source = f'{font_file}:{stat.st_size}:{stat.st_mtime_ns}:{font_size}:{self.get_charset()}'
+        return hashlib.sha1(source.encode('utf-8')).hexdigest()
+
+    def get_atlas_name(self, font_file, font_size):
+        """ 保存するファイルの名前(拡張子なし)を返すメソッド """
+        return f'{os.path.splitext(os.path.basename(font_file))[0]}_{font_size}'
+
+    def get_atlas(self, font_file, font_size):
+        """ 用意済みのアトラスを返すメソッド(build_allで用意していない大きさはNone) """
+        return self.atlases.get((font_file, font_size))
+
+    def load_or_bake(self, font_file, font_size):
+        """ 保存済みのアトラスが有効なら読み込み、なければ描画して保存するメソッド """
+        name = self.get_atlas_name(font_file, font_size)
+        image_path = os.path.join(self.cache_dir, f'{name}.png')
+        metrics_path = os.path.join(self.cache_dir, f'{name}.json')
+        cache_key = self.get_cache_key(font_file, font_size)
+        atlas = GlyphAtlas.load(font_file, font_size, image_path, metrics_path, cache_key)
+        if atlas is None:
+            atlas = GlyphAtlas.bake(font_file, font_size, self.get_charset())
+            atlas.save(image_path, metrics_path, cache_key)
+        return atlas
+
+    def build_all(self, font_file, font_sizes):
+        """ 指定された大きさのアトラスをすべて用意し、それ以外の大きさの保存済みアトラスを削除するメソッド """
+        for font_size in font_sizes:
+            if (font_file, font_size) not in self.atlases:
+                self.atlases[(font_file, font_size)] = self.load_or_bake(font_file, font_size)
+        self.prune(font_file, font_sizes)
+
+    def prune(self, font_file, font_sizes):
+        """ 指定された大きさ以外の保存済みアトラスを削除するメソッド """
+        names = {self.get_atlas_name(font_file, font_size) for font_size in font_sizes}
+        prefix = self.get_atlas_name(font_file, '')
+        for path in glob.glob(os.path.join(self.cache_dir, f'{prefix}*')):
+            name, extension = os.path.splitext(os.path.basename(path))
+            if extension in ('.png', '.json') and name[len(prefix):].isdigit() and name not in names:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+
+# プロセス全体で共有するレジストリ
+GLYPH_ATLASES = GlyphAtlasRegistry(sg.GLYPH_ATLAS_DIR)
+
+
+def get_atlas_font_sizes():
+    """ アトラスから組み立てる文字の大きさ(settings/*.txtで指定されている大きさ)を返す関数 """
+    return sorted({getattr(get_layout(name), field) for name, field in ATLAS_LAYOUT_FIELDS})
+
+
+def render_atlas_text(font_file, font_size, text, antialias, color):
+    """
+    アトラスから文字列を組み立てる関数(text_cache.render_textと同じ引数)
+    アトラスは常にアンチエイリアスありで描画される
+    アトラスを用意していない大きさ(拡大縮小・縮小表示した文字)はrender_textで描画する
+    """
+    atlas = GLYPH_ATLASES.get_atlas(font_file, font_size)
+    if atlas is None:
+        return render_text(font_file, font_size, text, antialias, color)
+    return atlas.render(text, color)
+
+
+if __name__ == '__main__':
+    # アトラスから組み立てる文字の大きさのアトラスを事前に作成する
+    pygame.init()
+    GLYPH_ATLASES.build_all(sg.FONT_FILE_PATH, get_atlas_font_sizes())
@@ -0,0 +1,43 @@
+class HitTestGrid:
+    """ マウスで操作できる部品を、画面を等間隔に区切ったマスごとに登録しておくクラス """
+
+    def __init__(self, cell_size):
+        """
+        :param cell_size: 1マスの大きさ(ピクセル)
+        """
+        self.cell_size = cell_size
+        # (列, 行)をキーにした、そのマスに重なる部品のリスト(登録順)
+        self.cells = {}
+
+    def get_cell(self, pos):
+        """ 座標が含まれるマスを返すメソッド """
+        return pos[0] // self.cell_size, pos[1] // self.cell_size
+
+    def rebuild(self, parts):
+        """
+        部品を登録し直すメソッド
+        :param parts: 部品のリスト(get_hit_rectがNoneを返す部品は登録しない)
+        """
+        self.cells = {}
+        for part in parts:
+            rect = part.get_hit_rect()
+            if rect is None or rect.width <= 0 or rect.height <= 0:
+                continue
+            left, top = self.get_cell(rect.topleft)
+            right, bottom = self.get_cell((rect.right - 1, rect.bottom - 1))
+            for column in range(left, right + 1):
+                for row in range(top, bottom + 1):
+                    self.cells.setdefault((column, row), []).append(part)
+
+    def query(self, pos):
+        """
+        座標の下にあり、マウスで操作できる状態の部品を返すメソッド
+        :param pos: マウスの座標
+        :return: 部品のリスト(登録順)
+        """
+        return [part for part in self.cells.get(self.get_cell(pos), ())
+                if part.is_input_enabled() and part.get_hit_rect().collidepoint(pos)]
+
+
+if __name__ == '__main__':
+    pass
@@ -1,27 +1,224 @@
+import collections
 import setting as sg
 import pygame
+from dirty_rect import DirtyRectTracker
+from text_cache import render_text
+from font_registry import get_font
+from scaling import VIEWPORT
 
+# 行頭に置かない文字(禁則処理)
+NOT_AT_LINE_START = '、。，．・：；？！ー―…）」』】〕〉》｝］／,.:;?!)]}'
+# 行末に置かない文字(禁則処理)
+NOT_AT_LINE_END = '（「『【〔〈《｛［([{'
 
-class BaseLabel:
-    def __init__(self, text, font_size, color):
+
+def split_units(text):
+    """
+    改行してよい位置で文字列を区切る関数
+    英単語はまとめて1つにし、禁則文字は前後の単位とつなげる
+
+    :param text: 区切る文字列
+    :return: 区切った文字列のリスト
+    """
+    units = []
+    word = ''
+    for char in text:
+        if char.isascii() and not char.isspace():
+            word += char
+            continue
+        if word:
+            units.append(word)
+            word = ''
+        units.append(char)
+    if word:
+        units.append(word)
+    merged = []
+    for unit in units:
+        if merged and (unit[0] in NOT_AT_LINE_START or merged[-1][-1] in NOT_AT_LINE_END):
+            merged[-1] += unit
+        else:
+            merged.append(unit)
+    return merged
+
+
+class TextLayout:
+    """ 折り返し位置と描画結果を(内容, 幅, フォント)ごとに記憶するレイアウトエンジン """
+
+    def __init__(self, max_entries):
+        """
+        :param max_entries: 記憶しておく結果の最大数(種類ごと)
+        """
+        self.max_entries = max_entries
+        # (内容, フォントファイル, 文字の大きさ, 幅)をキーにした行のタプル
+        self.lines_cache = collections.OrderedDict()
+        # (内容, フォントファイル, 文字の大きさ, 幅, 高さ)をキーにした(文字の大きさ, 行のタプル)
+        self.fit_cache = collections.OrderedDict()
+        # (内容, フォントファイル, 文字の大きさ, 幅, 高さ, 色, 描画関数)をキーにしたサーフェス
+        self.surface_cache = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, cache, key):
+        """ 記憶している結果を返すメソッド(ない場合はNone) """
+        value = cache.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            cache.move_to_end(key)
+        return value
+
+    def remember(self, cache, key, value):
+        """ 結果を記憶するメソッド(上限を超えたら古いものから忘れる) """
+        cache[key] = value
+        while len(cache) > self.max_entries:
+            cache.popitem(last=False)
+        return value
+
+    def break_lines(self, text, font_file, font_size, width):
+        """
+        文字列を幅に収まるように折り返すメソッド
+
+        :param text: 折り返す文字列
+        :param font_file: フォントファイルのパス
+        :param font_size: 文字の大きさ
+        :param width: 1行の最大幅
+        :return: 行のタプル
+        """
+        key = (text, font_file, font_size, width)
+        lines = self.lookup(self.lines_cache, key)
+        if lines is not None:
+            return lines
+        font = get_font(font_file, font_size)
+        lines = []
+        line = ''
+        for unit in split_units(text):
+            candidate = line + unit
+            if line and font.size(candidate.rstrip())[0] > width:
+                lines.append(line.rstrip())
+                line = unit.lstrip()
+            else:
+                line = candidate
+            # 1つの単位だけで幅を超える場合は文字単位で折り返す
+            while len(line.rstrip()) > 1 and font.size(line.rstrip())[0] > width:
+                split_at = len(line.rstrip()) - 1
+                while split_at > 1 and font.size(line[:split_at])[0] > width:
+                    split_at -= 1
+                lines.append(line[:split_at])
+                line = line[split_at:]
+        if line or not lines:
+            lines.append(line)
+        return self.remember(self.lines_cache, key, tuple(lines))
+
+    def fit(self, text, font_file, font_size, box_size):
+        """
+        折り返した文字列が領域に収まるまで文字を小さくするメソッド
+
+        :param text: 折り返す文字列
+        :param font_file: フォントファイルのパス
+        :param font_size: 最大の文字の大きさ
+        :param box_size: 領域の大きさ(width, height)
+        :return: (文字の大きさ, 行のタプル)
+        """
+        key = (text, font_file, font_size, box_size)
+        fitted = self.lookup(self.fit_cache, key)
+        if fitted is not None:
+            return fitted
+        width, height = box_size
+        # 最大の大きさが下限より小さい場合もその大きさで1回は折り返す
+        for size in range(font_size, min(font_size, sg.TEXT_LAYOUT_MIN_FONT_SIZE) - 1, -1):
+            lines = self.break_lines(text, font_file, size, width)
+            if len(lines) * get_font(font_file, size).get_linesize() <= height:
+                break
+        return self.remember(self.fit_cache, key, (size, lines))
+
+    def render(self, text, font_file, font_size, box_size, color, renderer=render_text):
+        """
+        領域に収まるように折り返した文字列を描画するメソッド
+
+        :param text: 描画する文字列
+        :param font_file: フォントファイルのパス
+        :param font_size: 最大の文字の大きさ
+        :param box_size: 領域の大きさ(width, height)
+        :param color: 文字の色
+        :param renderer: 1行を描画する関数(render_textと同じ引数、縮小した場合はrender_textを使う)
+        :return: 描画済みのサーフェス(共有されるため変更してはいけない)
+        """
+        key = (text, font_file, font_size, box_size, tuple(color), renderer)
+        surface = self.lookup(self.surface_cache, key)
+        if surface is not None:
+            return surface
+        size, lines = self.fit(text, font_file, font_size, box_size)
+        line_height = get_font(font_file, size).get_linesize()
+        # 縮小した大きさにはアトラスがないので、文字列単位のキャッシュで描画する
+        if size != font_size:
+            renderer = render_text
+        rendered_lines = [renderer(font_file, size, line, True, color) for line in lines]
+        width = max(1, max(rendered.get_width() for rendered in rendered_lines))
+        surface = pygame.Surface((width, line_height * len(lines)), pygame.SRCALPHA)
+        for i, rendered in enumerate(rendered_lines):
+            surface.blit(rendered, (0, i * line_height), special_flags=pygame.BLEND_RGBA_MAX)
+        return self.remember(self.surface_cache, key, surface)
+
+
+# プロセス全体で共有するレイアウトエンジン
+TEXT_LAYOUT = TextLayout(sg.TEXT_LAYOUT_CACHE_SIZE)
+
+
+class BaseLabel(DirtyRectTracker):
+    def __init__(self, text, font_size, color, renderer=render_text):
         """
         :param text: 表示する内容
         :param font_size: 文字の大きさ
         :param color: 文字の色
+        :param renderer: 文字列を描画する関数(render_textと同じ引数)
         """
+        super().__init__()
         self.text = text
-        self.font = pygame.font.Font(sg.FONT_FILE_PATH, font_size)
+        # settingsに書かれた(論理解像度での)文字の大きさ
+        self.logical_font_size = font_size
         self.color = color
-        self.rendered_text = self.font.render(self.text, True, self.color)
+        self.renderer = renderer
         self.is_active = True
+        self.relayout()
+
+    def relayout(self):
+        """ 現在の倍率に合わせた文字の大きさで描画し直すメソッド """
+        self.font_size = VIEWPORT.scale_font_size(self.logical_font_size)
+        self.font = get_font(sg.FONT_FILE_PATH, self.font_size)
+        self.rendered_text = self.render(self.text)
+        # 前もって描画しておいた(内容, サーフェス)
+        self.prepared = (None, None)
+
+    def render(self, text):
+        """ rendererを使って文字列を描画するメソッド """
+        return self.renderer(sg.FONT_FILE_PATH, self.font_size, text, True, self.color)
 
     def update_text(self, new_text):
         """
         表示する内容を更新するメソッド
         :param new_text: 新たに格納する内容
         """
+        # 内容が変わらない場合は再描画しない
+        if self.text == new_text:
+            return
+        self.mark_dirty()
         self.text = new_text
-        self.rendered_text = self.font.render(self.text, True, self.color)
+        # 前もって描画してあればそれを使う
+        if self.prepared[0] == new_text:
+            self.rendered_text = self.prepared[1]
+        else:
+            self.rendered_text = self.render(self.text)
+        self.prepared = (None, None)
+        self.mark_changed()
+
+    def prepare_text(self, new_text):
+        """
+        次に表示する内容を前もって描画しておくメソッド(表示は変わらない)
+        :param new_text: 次に表示する内容
+        """
+        if self.prepared[0] != new_text:
+            self.prepared = (new_text, self.render(new_text))
 
     def draw(self, screen):
         """ 描画処理を行うメソッド """
@@ -33,23 +230,41 @@ class BaseLabel:
 
     def is_active_true(self):
         """ is_activeにTrueを格納するメソッド """
-        self.is_active = True
+        if not self.is_active:
+            self.is_active = True
+            self.mark_changed()
 
     def is_active_false(self):
         """ is_activeにFalseを格納するメソッド """
-        self.is_active = False
+        if self.is_active:
+            self.is_active = False
+            self.mark_changed()
 
 
 class Label(BaseLabel):
-    def __init__(self, text, font_size, color, position):
+    def __init__(self, text, font_size, color, position, renderer=render_text):
         """
         :param text: 表示する内容
         :param font_size: 文字の大きさ
         :param color: 文字の色
         :param position: 文字の描画位置
+        :param renderer: 文字列を描画する関数(render_textと同じ引数)
         """
-        super().__init__(text, font_size, color)
-        self.position = position
+        self.logical_position = tuple(position)
+        super().__init__(text, font_size, color, renderer)
+
+    def relayout(self):
+        """ 現在の倍率に合わせて描画位置と文字を計算し直すメソッド """
+        self.position = VIEWPORT.scale_pos(self.logical_position)
+        super().relayout()
+
+    def get_rect(self):
+        """ 描画領域を返すメソッド """
+        return self.rendered_text.get_rect(topleft=self.position)
+
+    def is_static(self):
+        """ 内容が変わるまでは静的レイヤーに焼き込める """
+        return True
 
     def draw(self, screen):
         """ 描画処理を行うメソッド """
@@ -59,6 +274,62 @@ class Label(BaseLabel):
             pass
 
 
+class WrappedLabel(Label):
+    def __init__(self, text, font_size, color, position, box_size, renderer=render_text):
+        """
+        領域の幅で折り返し、収まらない場合は文字を小さくして表示するラベル
+
+        :param text: 表示する内容
+        :param font_size: 最大の文字の大きさ
+        :param color: 文字の色
+        :param position: 文字の描画位置
+        :param box_size: 表示する領域の大きさ(width, height)
+        :param renderer: 1行を描画する関数(render_textと同じ引数)
+        """
+        self.logical_box_size = tuple(box_size)
+        super().__init__(text, font_size, color, position, renderer)
+
+    def relayout(self):
+        """ 現在の倍率に合わせて領域の大きさを計算し直し、折り返し直すメソッド """
+        self.box_size = VIEWPORT.scale_size(self.logical_box_size)
+        super().relayout()
+
+    def render(self, text):
+        """ 折り返した文字列を描画するメソッド """
+        return TEXT_LAYOUT.render(text, sg.FONT_FILE_PATH, self.font_size, self.box_size,
+                                  self.color, self.renderer)
+
+
+class BoundLabel(Label):
+    def __init__(self, source, formatter, font_size, color, position):
+        """
+        sourceの値が変化したときだけ表示する内容を更新するラベル
+
+        :param source: 表示する値を返す関数
+        :param formatter: 値を表示する内容に変換する関数
+        :param font_size: 文字の大きさ
+        :param color: 文字の色
+        :param position: 文字の描画位置
+        """
+        self.source = source
+        self.formatter = formatter
+        # 最後に表示した値
+        self.value = source()
+        super().__init__(formatter(self.value), font_size, color, position)
+
+    def is_static(self):
+        """ 値に応じて内容が変わるため静的レイヤーには焼き込まない """
+        return False
+
+    def refresh(self):
+        """ sourceの値を確認し、変化していれば表示する内容を更新するメソッド """
+        value = self.source()
+        if value == self.value:
+            return
+        self.value = value
+        self.update_text(self.formatter(value))
+
+
 class LoopLabel(BaseLabel):
     def __init__(self, text, font_size, color, position, loop_num):
         """
@@ -68,11 +339,21 @@ class LoopLabel(BaseLabel):
         :param position: 文字の描画位置
         :param loop_num: ループ回数
         """
-        super().__init__(text, font_size, color)
-        self.x = position[0]
-        self.y = position[1]
-        self.font_size = font_size
+        self.logical_position = tuple(position)
         self.loop_num = loop_num
+        super().__init__(text, font_size, color)
+
+    def relayout(self):
+        """ 現在の倍率に合わせて描画位置と文字を計算し直すメソッド """
+        self.x, self.y = VIEWPORT.scale_pos(self.logical_position)
+        super().relayout()
+
+    def get_rect(self):
+        """ 描画領域を返すメソッド """
+        if self.loop_num <= 0:
+            return pygame.Rect(self.x, self.y, 0, 0)
+        width = (self.loop_num - 1) * self.font_size + self.rendered_text.get_width()
+        return pygame.Rect(self.x, self.y, width, self.rendered_text.get_height())
 
     def draw(self, screen):
         """ 描画処理を行うメソッド """
@@ -88,7 +369,11 @@ class LoopLabel(BaseLabel):
 
         :param new_loop_num: 新たに設定するloop回数
         """
+        if self.loop_num == new_loop_num:
+            return
+        self.mark_dirty()
         self.loop_num = new_loop_num
+        self.mark_changed()
 
 
 if __name__ == '__main__':
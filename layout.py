@@ -0,0 +1,199 @@
+import json
+import os
+from collections import namedtuple
+import setting as sg
+
+# 画面の名前(settings/<画面>.txt)をキーにした、レイアウトファイルに書くべき項目(値はすべて整数)
+LAYOUT_SCHEMAS = {
+    'GamePlayScreen': (
+        'label_current_life_font_size', 'label_current_life_x', 'label_current_life_y',
+        'text_box_answer_font_size', 'text_box_answer_x', 'text_box_answer_y',
+        'text_box_answer_width', 'text_box_answer_height', 'label_parts_font_size', 'label_parts_x',
+        'label_parts_y', 'label_question_font_size', 'label_question_x', 'label_question_y',
+        'label_question_width', 'label_question_height', 'button_menu_font_size', 'button_menu_x',
+        'button_menu_y', 'button_menu_width', 'button_menu_height', 'gray_surface_alpha',
+        'sub_screen_width', 'sub_screen_height', 'sub_screen_border_width',
+        'button_back_game_play_screen_font_size', 'button_back_game_play_screen_x',
+        'button_back_game_play_screen_y', 'button_back_game_play_screen_width',
+        'button_back_game_play_screen_height', 'button_back_game_setting_screen_font_size',
+        'button_back_game_setting_screen_x', 'button_back_game_setting_screen_y',
+        'button_back_game_setting_screen_width', 'button_back_game_setting_screen_height',
+        'button_back_title_screen_font_size', 'button_back_title_screen_x',
+        'button_back_title_screen_y', 'button_back_title_screen_width',
+        'button_back_title_screen_height',
+    ),
+    'GameScoreScreen': (
+        'label_result_font_size', 'label_result_x', 'label_result_y', 'label_game_score_font_size',
+        'label_game_score_x', 'label_game_score_y', 'label_game_mistake_font_size',
+        'label_game_mistake_x', 'label_game_mistake_y', 'chart_font_size', 'chart_width',
+        'chart_height', 'chart_accuracy_x', 'chart_accuracy_y', 'chart_part_accuracy_x',
+        'chart_part_accuracy_y', 'chart_response_time_x', 'chart_response_time_y',
+        'button_retry_font_size', 'button_retry_x', 'button_retry_y', 'button_retry_width',
+        'button_retry_height', 'button_back_title_font_size', 'button_back_title_x',
+        'button_back_title_y', 'button_back_title_width', 'button_back_title_height',
+    ),
+    'GameSettingScreen': (
+        'label_current_difficulty_font_size', 'label_current_difficulty_x',
+        'label_current_difficulty_y', 'label_current_game_mode_font_size',
+        'label_current_game_mode_x', 'label_current_game_mode_y', 'label_difficulty_font_size',
+        'label_difficulty_x', 'label_difficulty_y', 'button_diff_width', 'button_diff_height',
+        'button_diff_font_size', 'button_easy_x', 'button_easy_y', 'button_normal_x',
+        'button_normal_y', 'button_hard_x', 'button_hard_y', 'label_game_mode_font_size',
+        'label_game_mode_x', 'label_game_mode_y', 'button_game_mode_width',
+        'button_game_mode_height', 'button_game_mode_font_size', 'button_practice_x',
+        'button_practice_y', 'button_standard_x', 'button_standard_y', 'button_endless_x',
+        'button_endless_y', 'button_game_play_font_size', 'button_game_play_x',
+        'button_game_play_y', 'button_game_play_width', 'button_game_play_height',
+    ),
+    'ShowVocabularyScreen': (
+        'label_diff_font_size', 'label_diff_x', 'label_diff_y', 'label_words_font_size',
+        'list_view_words_x', 'list_view_words_y', 'list_view_words_width', 'list_view_words_height',
+        'list_view_words_row_height', 'button_back_page_font_size', 'button_back_page_x',
+        'button_back_page_y', 'button_back_page_width', 'button_back_page_height',
+        'button_next_page_font_size', 'button_next_page_x', 'button_next_page_y',
+        'button_next_page_width', 'button_next_page_height', 'label_page_font_size', 'label_page_x',
+        'label_page_y',
+    ),
+    'SystemSettingsScreen': (
+        'label_volume_font_size', 'label_volume_x', 'label_volume_y', 'label_se_volume_font_size',
+        'label_se_volume_x', 'label_se_volume_y', 'button_se_volume_width',
+        'button_se_volume_height', 'button_se_volume_font_size', 'button_se_volume_sub_x',
+        'button_se_volume_sub_y', 'button_se_volume_add_x', 'button_se_volume_add_y',
+        'label_show_se_volume_font_size', 'label_show_se_volume_x', 'label_show_se_volume_y',
+    ),
+    'TitleScreen': (
+        'label_title_font_size', 'label_title_x', 'label_title_y', 'button_play_x', 'button_play_y',
+        'button_play_width', 'button_play_height', 'button_play_font_size', 'button_vocabulary_x',
+        'button_vocabulary_y', 'button_vocabulary_width', 'button_vocabulary_height',
+        'button_vocabulary_font_size', 'button_system_settings_x', 'button_system_settings_y',
+        'button_system_settings_width', 'button_system_settings_height',
+        'button_system_settings_font_size',
+    ),
+    'VocabularyScreen': (
+        'label_description_font_size', 'label_description_x', 'label_description_y',
+        'button_diff_width', 'button_diff_height', 'button_diff_font_size', 'button_easy_x',
+        'button_easy_y', 'button_normal_x', 'button_normal_y', 'button_hard_x', 'button_hard_y',
+    ),
+}
+
+# 画面の名前をキーにした、レイアウトを保持する読み取り専用のレコードの型
+LAYOUT_TYPES = {name: namedtuple(f'{name}Layout', fields) for name, fields in LAYOUT_SCHEMAS.items()}
+
+
+def parse_layout_file(file_name):
+    """
+    レイアウトファイルを読み込み、項目名をキーにした整数の辞書を返す関数
+
+    :param file_name: レイアウトファイルのパス
+    :return: 項目名をキーにした値の辞書
+    """
+    values = {}
+    with open(file_name, 'r', encoding='utf-8') as f:
+        for line_num, line in enumerate(f, 1):
+            line = line.strip()
+            if '=' not in line:
+                continue
+            name, value = (part.strip() for part in line.split('=', 1))
+            try:
+                values[name] = int(value)
+            except ValueError:
+                raise ValueError(f'{file_name}:{line_num}: {name} should be an integer: {value!r}') from None
+    return values
+
+
+def build_layout(name, values, file_name):
+    """
+    値の辞書を検証してレコードにする関数
+    足りない項目・知らない項目があれば画面を作る前にValueErrorを発生させる
+
+    :param name: 画面の名前
+    :param values: 項目名をキーにした値の辞書
+    :param file_name: エラーメッセージに使うレイアウトファイルのパス
+    :return: レコード
+    """
+    fields = LAYOUT_SCHEMAS[name]
+    missing = [field for field in fields if field not in values]
+    unknown = sorted(set(values) - set(fields))
+    if missing or unknown:
+        raise ValueError(f'{file_name}: missing keys {missing}, unknown keys {unknown}')
+    return LAYOUT_TYPES[name](**values)
+
+
+def load_layout_cache(cache_file):
+    """ 前回の起動で保存したレイアウトのキャッシュを返す関数(ない・壊れている場合は空の辞書) """
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def save_layout_cache(cache_file, cache):
+    """ レイアウトのキャッシュを保存する関数(保存できなくても起動は続ける) """
+    try:
+        os.makedirs(os.path.dirname(cache_file) or '.', exist_ok=True)
+        with open(cache_file, 'w', encoding='utf-8') as f:
+            json.dump(cache, f)
+    except OSError:
+        pass
+
+
+def load_layouts(settings_dir='settings', cache_file=sg.LAYOUT_CACHE_FILE):
+    """
+    すべての画面のレイアウトを読み込む関数
+    ファイルの更新時刻と大きさがキャッシュと同じ画面はファイルを読まずにキャッシュの値を使う
+
+    :param settings_dir: レイアウトファイルのあるディレクトリ
+    :param cache_file: キャッシュのパス
+    :return: 画面の名前をキーにしたレコードの辞書
+    """
+    cache = load_layout_cache(cache_file)
+    new_cache = {}
+    layouts = {}
+    for name in LAYOUT_SCHEMAS:
+        file_name = os.path.join(settings_dir, f'{name}.txt')
+        stat = os.stat(file_name)
+        key = [stat.st_mtime_ns, stat.st_size]
+        entry = cache.get(name)
+        if isinstance(entry, dict) and entry.get('key') == key and isinstance(entry.get('values'), dict):
+            values = entry['values']
+        else:
+            values = parse_layout_file(file_name)
+        layouts[name] = build_layout(name, values, file_name)
+        new_cache[name] = {'key': key, 'values': values}
+    if new_cache != cache:
+        save_layout_cache(cache_file, new_cache)
+    return layouts
+
+
+# 画面の名前をキーにした、読み込み済みのレイアウト
+LAYOUTS = {}
+
+
+def init_layouts(settings_dir='settings', cache_file=sg.LAYOUT_CACHE_FILE):
+    """ 全画面のレイアウトを読み込んでおく関数(起動時に1回呼ぶ) """
+    LAYOUTS.clear()
+    LAYOUTS.update(load_layouts(settings_dir, cache_file))
+
+
+def get_layout(name):
+    """
+    画面のレイアウトを返す関数(読み込んでいなければ全画面分をまとめて読み込む)
+    :param name: 画面の名前
+    :return: 項目名を属性に持つレコード
+    """
+    if not LAYOUTS:
+        init_layouts()
+    return LAYOUTS[name]
+
+
+def get_all_layouts():
+    """ 全画面のレイアウトを返す関数 """
+    if not LAYOUTS:
+        init_layouts()
+    return list(LAYOUTS.values())
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,173 @@
+import collections
+import setting as sg
+import pygame
+from dirty_rect import DirtyRectTracker
+from font_registry import get_font
+from label import TEXT_LAYOUT
+from scaling import VIEWPORT
+
+
+class VirtualListView(DirtyRectTracker):
+    """ 表示範囲の行だけを描画する、スクロール可能なリスト """
+
+    # マウスホイールとキー入力を受け取る
+    EVENT_TYPES = (pygame.MOUSEWHEEL, pygame.KEYDOWN)
+
+    def __init__(self, pos, view_size, row_height, font_size, color, items, formatter):
+        """
+        :param pos: 描画位置(x, y)
+        :param view_size: 表示領域の大きさ(width, height)
+        :param row_height: 1行の高さ
+        :param font_size: 文字の大きさ
+        :param color: 文字の色
+        :param items: 表示する要素のシーケンス
+        :param formatter: 要素を表示する内容に変換する関数
+        """
+        super().__init__()
+        # settingsに書かれた(論理解像度での)位置・大きさ・文字の大きさ
+        self.logical_pos = tuple(pos)
+        self.logical_size = tuple(view_size)
+        self.logical_row_height = row_height
+        self.logical_font_size = font_size
+        self.color = color
+        self.formatter = formatter
+        # 行番号をキーにした描画済みの行(古いものから再利用する)
+        self.row_cache = collections.OrderedDict()
+        # 再利用を待っている行のサーフェス
+        self.free_rows = []
+        self.items = items
+        # 一番上に表示している位置(ピクセル)
+        self.scroll_y = 0
+        self.row_height = None
+        self.relayout()
+
+    def relayout(self):
+        """ 現在の倍率に合わせて表示領域と行の大きさを計算し直すメソッド """
+        old_row_height = self.row_height
+        self.rect = VIEWPORT.scale_rect(self.logical_pos, self.logical_size)
+        self.row_height = VIEWPORT.scale_length(self.logical_row_height)
+        self.font_size = VIEWPORT.scale_font_size(self.logical_font_size)
+        # 1ページ(表示領域)に収まる行数
+        self.rows_per_page = max(1, self.rect.height // self.row_height)
+        self.row_cache_size = self.rows_per_page * 3
+        # 大きさの違う行のサーフェスは再利用できないので破棄する
+        self.row_cache.clear()
+        self.free_rows = []
+        # 一番上に表示している行が変わらないようにスクロール位置を変換する
+        if old_row_height is not None:
+            self.scroll_y = min(self.scroll_y * self.row_height // old_row_height, self.get_max_scroll())
+
+    def set_items(self, items):
+        """
+        表示する要素を入れ替えるメソッド
+        :param items: 表示する要素のシーケンス
+        """
+        self.items = items
+        self.scroll_y = 0
+        self.free_rows.extend(self.row_cache.values())
+        self.row_cache.clear()
+        self.mark_changed()
+
+    def get_hit_rect(self):
+        """ マウスホイールでスクロールできる領域を返すメソッド """
+        return self.rect
+
+    def get_max_scroll(self):
+        """ スクロールできる最大の位置を返すメソッド """
+        return max(0, len(self.items) * self.row_height - self.rect.height)
+
+    def scroll_to(self, new_scroll_y):
+        """
+        指定した位置までスクロールするメソッド
+        :param new_scroll_y: 一番上に表示する位置(ピクセル)
+        """
+        new_scroll_y = max(0, min(new_scroll_y, self.get_max_scroll()))
+        if self.scroll_y == new_scroll_y:
+            return
+        self.scroll_y = new_scroll_y
+        self.mark_dirty()
+
+    def scroll_rows(self, rows):
+        """
+        行単位でスクロールするメソッド
+        :param rows: スクロールする行数(負の値なら上へ)
+        """
+        self.scroll_to(self.scroll_y + rows * self.row_height)
+
+    def get_page(self):
+        """ 現在のページ(1から数える)を返すメソッド """
+        if self.scroll_y >= self.get_max_scroll():
+            return self.get_page_count()
+        return self.scroll_y // (self.rows_per_page * self.row_height) + 1
+
+    def get_page_count(self):
+        """ 全ページ数を返すメソッド """
+        return max(1, -(-len(self.items) // self.rows_per_page))
+
+    def page_up(self):
+        """ 前のページへスクロールするメソッド """
+        self.scroll_to((self.get_page() - 2) * self.rows_per_page * self.row_height)
+
+    def page_down(self):
+        """ 次のページへスクロールするメソッド """
+        self.scroll_to(self.get_page() * self.rows_per_page * self.row_height)
+
+    def get_row(self, index):
+        """
+        描画済みの行を返すメソッド
+        キャッシュにない場合は、一番古い行のサーフェスを再利用して描画する
+        :param index: 行番号
+        """
+        row = self.row_cache.get(index)
+        if row is not None:
+            self.row_cache.move_to_end(index)
+            return row
+        if len(self.row_cache) >= self.row_cache_size:
+            _, old_row = self.row_cache.popitem(last=False)
+            self.free_rows.append(old_row)
+        if self.free_rows:
+            row = self.free_rows.pop()
+        else:
+            row = pygame.Surface((self.rect.width, self.row_height)).convert()
+        row.fill(sg.WHITE)
+        # 行に収まらない内容は折り返して、必要なら文字を小さくする
+        font_size, lines = TEXT_LAYOUT.fit(self.formatter(self.items[index]), sg.FONT_FILE_PATH,
+                                           self.font_size, (self.rect.width, self.row_height))
+        font = get_font(sg.FONT_FILE_PATH, font_size)
+        for i, line in enumerate(lines):
+            row.blit(font.render(line, True, self.color), (0, i * font.get_linesize()))
+        self.row_cache[index] = row
+        return row
+
+    def draw(self, screen):
+        """ 表示範囲に入っている行だけを描画するメソッド """
+        old_clip = screen.get_clip()
+        screen.set_clip(old_clip.clip(self.rect))
+        first_row = self.scroll_y // self.row_height
+        last_row = min(len(self.items), (self.scroll_y + self.rect.height - 1) // self.row_height + 1)
+        for index in range(first_row, last_row):
+            screen.blit(self.get_row(index), (self.rect.x, self.rect.y + index * self.row_height - self.scroll_y))
+        screen.set_clip(old_clip)
+
+    def handle_event(self, event):
+        """ マウスホイールとキー入力でスクロールするメソッド """
+        # マウスのイベントは、マウスがリストの上にある時だけ画面から渡される
+        if event.type == pygame.MOUSEWHEEL:
+            self.scroll_rows(-event.y * sg.LIST_VIEW_WHEEL_ROWS)
+        elif event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_UP:
+                self.scroll_rows(-1)
+            elif event.key == pygame.K_DOWN:
+                self.scroll_rows(1)
+            elif event.key == pygame.K_PAGEUP:
+                self.page_up()
+            elif event.key == pygame.K_PAGEDOWN:
+                self.page_down()
+            elif event.key == pygame.K_HOME:
+                self.scroll_to(0)
+            elif event.key == pygame.K_END:
+                self.scroll_to(self.get_max_scroll())
+
+
+if __name__ == '__main__':
+    pass
@@ -1,8 +1,160 @@
 import setting as sg
-from screen import TitleScreen
+from screen import ScreenManager, TitleScreen
 import sys
+import heapq
+import itertools
+import time
 import pygame
 from sound import SoundPlayer
+from font_registry import preload_layout_fonts
+from glyph_atlas import GLYPH_ATLASES, get_atlas_font_sizes
+from layout import init_layouts
+from scaling import VIEWPORT
+
+
+class ScreenTransition:
+    """ 切り替え前後の画面のスナップショットだけを使って切り替えを演出するクラス """
+
+    def __init__(self, old_snapshot, new_snapshot, effect, duration):
+        """
+        :param old_snapshot: 切り替え前の画面
+        :param new_snapshot: 切り替え後の画面
+        :param effect: 演出の種類('fade'または'slide')
+        :param duration: 演出にかける時間(ミリ秒)
+        """
+        self.old_snapshot = old_snapshot
+        self.new_snapshot = new_snapshot
+        self.effect = effect
+        self.duration = duration
+        self.start_time = pygame.time.get_ticks()
+
+    def get_progress(self):
+        """ 経過時間から進み具合(0.0-1.0)を返すメソッド(フレームレートに依存しない) """
+        if self.duration <= 0:
+            return 1.0
+        return min(1.0, (pygame.time.get_ticks() - self.start_time) / self.duration)
+
+    def is_finished(self):
+        """ 演出が終わったかどうかを返すメソッド """
+        return self.get_progress() >= 1.0
+
+    def draw(self, screen):
+        """ 進み具合に応じて2枚のスナップショットを描画するメソッド """
+        progress = self.get_progress()
+        # 始めと終わりを緩やかにする
+        progress = progress * progress * (3 - 2 * progress)
+        if self.effect == 'slide':
+            offset = round(screen.get_width() * progress)
+            screen.blit(self.old_snapshot, (-offset, 0))
+            screen.blit(self.new_snapshot, (screen.get_width() - offset, 0))
+        else:
+            screen.blit(self.old_snapshot, (0, 0))
+            self.new_snapshot.set_alpha(round(255 * progress))
+            screen.blit(self.new_snapshot, (0, 0))
+
+
+class FrameScheduler:
+    """
+    ジェネレータのタスクを、1フレームのうちイベント処理と描画が終わった後の残り時間だけ進めるクラス
+    優先度の数値が小さいタスクから進め、同じ優先度のタスクは1ステップずつ順番に進める
+    """
+
+    def __init__(self):
+        # (優先度, 登録順, 名前, ジェネレータ)のヒープ
+        self.tasks = []
+        self.order = itertools.count()
+        # 名前をキーにした、これまでにかかった時間(秒)と進めた回数
+        self.task_times = {}
+        self.task_steps = {}
+
+    def add_task(self, name, task, priority=0):
+        """
+        タスクを登録するメソッド(同じ名前のタスクがあれば置き換える)
+
+        :param name: タスクの名前
+        :param task: 1ステップごとにyieldするジェネレータ
+        :param priority: 優先度(小さいほど先に進める)
+        """
+        self.cancel(name)
+        heapq.heappush(self.tasks, (priority, next(self.order), name, task))
+
+    def cancel(self, name):
+        """ 指定した名前のタスクを取り消すメソッド """
+        tasks = [entry for entry in self.tasks if entry[2] != name]
+        if len(tasks) != len(self.tasks):
+            heapq.heapify(tasks)
+            self.tasks = tasks
+
+    def has_tasks(self):
+        """ 終わっていないタスクがあるかどうかを返すメソッド """
+        return bool(self.tasks)
+
+    def run(self, deadline):
+        """
+        期限までタスクを進めるメソッド
+        :param deadline: 期限(time.perf_counterの値)
+        """
+        while self.tasks and time.perf_counter() < deadline:
+            priority, _, name, task = heapq.heappop(self.tasks)
+            start = time.perf_counter()
+            try:
+                next(task)
+            except StopIteration:
+                is_finished = True
+            else:
+                is_finished = False
+            self.task_times[name] = self.task_times.get(name, 0) + time.perf_counter() - start
+            self.task_steps[name] = self.task_steps.get(name, 0) + 1
+            # 終わっていなければ同じ優先度のタスクの後ろに並び直す
+            if not is_finished:
+                heapq.heappush(self.tasks, (priority, next(self.order), name, task))
+
+    def get_stats(self):
+        """ タスクごとの(かかった時間(秒), 進めた回数)を返すメソッド """
+        return {name: (self.task_times[name], self.task_steps[name]) for name in self.task_times}
+
+
+class InputBatcher:
+    """ 1フレーム分のイベントのうち、連続するMOUSEMOTIONを最後の位置の1つにまとめるクラス """
+
+    def __init__(self):
+        # 直前のフレームで受け取ったイベントの数と、画面に渡したイベントの数
+        self.raw_count = 0
+        self.delivered_count = 0
+        # 起動してからの合計
+        self.total_raw_count = 0
+        self.total_delivered_count = 0
+
+    def batch(self, events):
+        """
+        イベントをまとめるメソッド(クリックやキー入力との前後関係は変えない)
+
+        :param events: 1フレーム分のイベントのリスト
+        :return: まとめたイベントのリスト
+        """
+        batched = []
+        for event in events:
+            if event.type == pygame.MOUSEMOTION and batched and batched[-1].type == pygame.MOUSEMOTION:
+                # 移動量は足し合わせ、位置とボタンの状態は最後のイベントのものを使う
+                previous = batched[-1]
+                rel = (previous.rel[0] + event.rel[0], previous.rel[1] + event.rel[1])
+                batched[-1] = pygame.event.Event(pygame.MOUSEMOTION, {**event.dict, 'rel': rel})
+            else:
+                batched.append(event)
+        self.raw_count = len(events)
+        self.delivered_count = len(batched)
+        self.total_raw_count += self.raw_count
+        self.total_delivered_count += self.delivered_count
+        return batched
+
+    def get_stats(self):
+        """ 受け取ったイベントと画面に渡したイベントの数を返すメソッド """
+        return {
+            'raw': self.raw_count,
+            'delivered': self.delivered_count,
+            'total_raw': self.total_raw_count,
+            'total_delivered': self.total_delivered_count,
+        }
 
 
 class Game:
@@ -11,45 +163,167 @@ class Game:
         # pygame初期化
         pygame.init()
         # ウィンドウサイズ指定
-        self.screen = pygame.display.set_mode((sg.SCREEN_WIDTH, sg.SCREEN_HEIGHT))
+        self.screen = pygame.display.set_mode(sg.WINDOW_SIZE, pygame.RESIZABLE if sg.WINDOW_RESIZABLE else 0)
+        # 論理解像度からウィンドウへの倍率を決める
+        VIEWPORT.resize(self.screen.get_size())
+        # 全画面のレイアウトを起動時にまとめて読み込んで検証する
+        init_layouts()
+        # 各画面で使う大きさのフォントを事前に読み込む
+        preload_layout_fonts()
+        # アトラスから組み立てる文字(問題文)の大きさのアトラスを起動時に用意する
+        # (それ以外の大きさはアトラスを使わずに描画する)
+        GLYPH_ATLASES.build_all(sg.FONT_FILE_PATH, get_atlas_font_sizes())
         # Clock()オブジェクトを作成
         self.clock = pygame.time.Clock()
         # SoundPlayerクラスのインスタンス化
         self.sound_player = SoundPlayer()
-        # TitleScreenクラスのインスタンス化
-        self.title_screen = TitleScreen(self.screen, self.change_screen, self.sound_player)
-        # 現在表示されている画面
-        self.current_screen = self.title_screen
+        # フレームの残り時間で処理を進めるスケジューラ
+        self.scheduler = FrameScheduler()
+        # 1フレーム分のイベントをまとめる
+        self.input_batcher = InputBatcher()
+        # 画面のインスタンスを使い回して切り替える
+        self.screen_manager = ScreenManager(self.screen, self.change_screen, self.sound_player, self.scheduler)
+        # 現在表示されている画面(最初のタイトル画面は切り替えの演出をしない)
+        self.current_screen = self.screen_manager.enter(TitleScreen)
+        # ウィンドウがフォーカスされているかどうか
+        self.is_focused = True
+        # ウィンドウが最小化されているかどうか
+        self.is_minimized = False
+        # 最後に入力があった時刻(ミリ秒)
+        self.last_input_time = 0
+        # 画面切り替えの演出(演出中でない場合はNone)
+        self.transition = None
 
     def change_screen(self, new_screen):
         # 画面を切り替える
         self.current_screen = new_screen
+        # 切り替え直後は画面全体を再描画する
+        self.current_screen.mark_all_dirty()
+        if sg.TRANSITION_EFFECT is not None:
+            self.start_transition()
+
+    def start_transition(self):
+        """ 表示中の画面と新しい画面のスナップショットを1回だけ作り、切り替えの演出を始めるメソッド """
+        old_snapshot = self.screen.copy()
+        new_snapshot = pygame.Surface(self.screen.get_size()).convert()
+        self.current_screen.render(new_snapshot)
+        self.transition = ScreenTransition(old_snapshot, new_snapshot,
+                                           sg.TRANSITION_EFFECT, sg.TRANSITION_DURATION)
 
     def run(self):
         while True:
             # フレームレート制御
-            self.clock.tick(sg.FPS)
-            # イベント処理
-            self.handle_events()
+            self.clock.tick(self.get_frame_rate())
+            # イベント処理(アイドル中はイベントが来るまで待つ)
+            waited_events = self.wait_events()
+            frame_start = time.perf_counter()
+            self.handle_events(waited_events)
+            # 更新処理
+            self.update()
             # 描画処理
             self.draw()
+            # 1フレームの残り時間でタスクを進める
+            self.scheduler.run(frame_start + 1 / self.get_frame_rate())
 
-    def handle_events(self):
-        for event in pygame.event.get():
+    def get_frame_rate(self):
+        """ フォーカスの状態に応じたフレームレートを返すメソッド """
+        if self.is_focused and not self.is_minimized:
+            return sg.FPS
+        # フォーカスが外れていても入力があった直後は通常のフレームレートに戻す
+        if pygame.time.get_ticks() - self.last_input_time < sg.INPUT_WAKE_TIME:
+            return sg.FPS
+        return sg.UNFOCUSED_FPS
+
+    def is_idle(self):
+        """ アニメーションもイベントもなく、描画を待たせてよいかどうかを返すメソッド """
+        return (self.transition is None and not self.current_screen.is_animating()
+                and not self.scheduler.has_tasks() and not pygame.event.peek())
+
+    def wait_events(self):
+        """
+        アイドル中はイベントが来るまで(最大IDLE_WAIT_TIMEOUTミリ秒)待つメソッド
+        :return: 待っている間に受け取ったイベントのリスト
+        """
+        if not self.is_idle():
+            return []
+        event = pygame.event.wait(sg.IDLE_WAIT_TIMEOUT)
+        if event.type == pygame.NOEVENT:
+            return []
+        return [event]
+
+    def handle_window_event(self, event):
+        """ ウィンドウの状態と入力の時刻を記録するメソッド """
+        if event.type == pygame.WINDOWFOCUSGAINED:
+            self.is_focused = True
+        elif event.type == pygame.WINDOWFOCUSLOST:
+            self.is_focused = False
+        elif event.type == pygame.WINDOWMINIMIZED:
+            self.is_minimized = True
+        elif event.type in (pygame.WINDOWRESTORED, pygame.WINDOWMAXIMIZED):
+            self.is_minimized = False
+        elif event.type in (pygame.KEYDOWN, pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN, pygame.MOUSEWHEEL):
+            self.last_input_time = pygame.time.get_ticks()
+
+    def handle_events(self, waited_events=()):
+        # マウスの移動はフレームごとに最後の位置だけを処理する
+        for event in self.input_batcher.batch(list(waited_events) + pygame.event.get()):
             # 終了イベント確認
             if event.type == pygame.QUIT:
                 self.sound_player.save_json()
                 pygame.quit()
                 sys.exit()
+            # ウィンドウの状態確認
+            self.handle_window_event(event)
+            # ウィンドウの大きさが変わった時だけ配置を計算し直す
+            if event.type == pygame.VIDEORESIZE:
+                self.resize()
             # 各イベント確認
             self.current_screen.on_event(event)
 
+    def resize(self):
+        """ ウィンドウの大きさに合わせて倍率を決め直し、表示中の画面を配置し直すメソッド """
+        self.screen = pygame.display.get_surface()
+        if not VIEWPORT.resize(self.screen.get_size()):
+            return
+        # 演出中のスナップショットは古い大きさなので演出を打ち切る
+        self.transition = None
+        self.screen_manager.relayout(self.screen)
+
+    def update(self):
+        # 表示する値の変化を反映する
+        self.current_screen.on_update()
+
     def draw(self):
-        # 描画処理
-        self.screen.fill(sg.WHITE)
-        self.current_screen.on_draw()
-        # 画面アップデート処理
+        # 切り替えの演出中はスナップショットだけを描画する
+        if self.transition is not None:
+            self.draw_transition()
+            return
+        # 変化した領域を取得
+        dirty_rects = self.current_screen.get_dirty_rects()
+        if not sg.DIRTY_RECT_RENDERING:
+            # 描画処理
+            self.screen.fill(sg.WHITE)
+            self.current_screen.on_draw()
+            # 画面アップデート処理
+            pygame.display.update()
+            return
+        # 変化した領域をまとめた範囲だけを1回で描画し直す(背景は各画面の静的レイヤーで塗りつぶされる)
+        if dirty_rects:
+            self.screen.set_clip(dirty_rects[0].unionall(dirty_rects[1:]))
+            self.current_screen.on_draw()
+            self.screen.set_clip(None)
+        # 変化した領域だけを画面に反映する
+        if dirty_rects:
+            pygame.display.update(dirty_rects)
+
+    def draw_transition(self):
+        """ 切り替えの演出を描画するメソッド """
+        self.transition.draw(self.screen)
         pygame.display.update()
+        if self.transition.is_finished():
+            self.transition = None
+            # 演出が終わったら新しい画面を描画し直す
+            self.current_screen.mark_all_dirty()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,193 @@
+import math
+import numpy as np
+import pygame
+import setting as sg
+from dirty_rect import DirtyRectTracker
+from scaling import VIEWPORT
+
+
+class ParticleSystem(DirtyRectTracker):
+    """
+    パーティクルの状態(位置・速度・寿命・色)をNumPyの配列で保持し、まとめて更新・描画するクラス
+    生きているパーティクルは配列の先頭に詰めて保持する
+    """
+
+    def __init__(self, max_particles):
+        """
+        :param max_particles: 同時に存在できるパーティクルの最大数
+        """
+        super().__init__()
+        self.max_particles = max_particles
+        self.positions = np.zeros((max_particles, 2), dtype=np.float32)
+        self.velocities = np.zeros((max_particles, 2), dtype=np.float32)
+        # 残りの寿命と最初の寿命(秒)
+        self.lives = np.zeros(max_particles, dtype=np.float32)
+        self.max_lives = np.ones(max_particles, dtype=np.float32)
+        self.colors = np.zeros((max_particles, 3), dtype=np.uint8)
+        # 生きているパーティクルの数
+        self.count = 0
+        # 最後に更新した時刻(ミリ秒)
+        self.last_time = 0
+        # 現在のパーティクルを描画したサーフェスとその位置
+        self.surface = None
+        self.rect = pygame.Rect(0, 0, 0, 0)
+
+    def get_rect(self):
+        """ 描画領域(全パーティクルを囲む矩形)を返すメソッド """
+        return self.rect
+
+    def is_alive(self):
+        """ 生きているパーティクルがあるかどうかを返すメソッド """
+        return self.count > 0
+
+    def emit(self, pos, num, colors):
+        """
+        指定した位置から全方向にパーティクルを放出するメソッド
+
+        :param pos: 放出する位置(ウィンドウ座標)
+        :param num: 放出する数(空きが足りない分は放出しない)
+        :param colors: パーティクルの色の候補
+        """
+        num = min(num, self.max_particles - self.count)
+        if num <= 0:
+            return
+        if self.count == 0:
+            self.last_time = pygame.time.get_ticks()
+        new = slice(self.count, self.count + num)
+        angles = np.random.uniform(0, 2 * math.pi, num)
+        speeds = np.random.uniform(*sg.PARTICLE_SPEED, num) * VIEWPORT.scale
+        self.positions[new] = pos
+        self.velocities[new, 0] = np.cos(angles) * speeds
+        self.velocities[new, 1] = np.sin(angles) * speeds
+        self.max_lives[new] = np.random.uniform(*sg.PARTICLE_LIFE, num)
+        self.lives[new] = self.max_lives[new]
+        palette = np.array(colors, dtype=np.uint8)
+        self.colors[new] = palette[np.random.randint(len(palette), size=num)]
+        self.count += num
+
+    def clear(self):
+        """ すべてのパーティクルを消すメソッド """
+        if self.count == 0:
+            return
+        self.count = 0
+        self.mark_dirty()
+        self.surface = None
+        self.rect = pygame.Rect(0, 0, 0, 0)
+
+    def update(self, bounds):
+        """
+        全パーティクルを前回の更新からの経過時間だけ進めて描画し直すメソッド
+        :param bounds: パーティクルが存在できる領域(外に出たものは消す)
+        """
+        if self.count == 0:
+            return
+        now = pygame.time.get_ticks()
+        dt = (now - self.last_time) / 1000
+        self.last_time = now
+        alive = slice(0, self.count)
+        self.velocities[alive, 1] += sg.PARTICLE_GRAVITY * VIEWPORT.scale * dt
+        self.positions[alive] += self.velocities[alive] * dt
+        self.lives[alive] -= dt
+        # 寿命が尽きたものと領域の外に出たものを取り除き、生きているものを先頭に詰める
+        positions = self.positions[alive]
+        keep = ((self.lives[alive] > 0)
+                & (positions[:, 0] >= bounds.left) & (positions[:, 0] < bounds.right)
+                & (positions[:, 1] >= bounds.top) & (positions[:, 1] < bounds.bottom))
+        count = int(np.count_nonzero(keep))
+        if count < self.count:
+            for array in (self.positions, self.velocities, self.lives, self.max_lives, self.colors):
+                array[:count] = array[alive][keep]
+            self.count = count
+        # 前のフレームの領域と新しい領域の両方を再描画させる
+        self.mark_dirty()
+        self.render()
+        self.mark_dirty()
+
+    def render(self):
+        """ 生きているパーティクルを、全体を囲む大きさのサーフェスに1回で描画するメソッド """
+        if self.count == 0:
+            self.surface = None
+            self.rect = pygame.Rect(0, 0, 0, 0)
+            return
+        size = VIEWPORT.scale_length(sg.PARTICLE_SIZE)
+        points = self.positions[:self.count].astype(np.int32)
+        left, top = points.min(axis=0)
+        right, bottom = points.max(axis=0) + size
+        self.rect = pygame.Rect(int(left), int(top), int(right - left), int(bottom - top))
+        self.surface = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+        points -= (left, top)
+        # 残りの寿命に応じて薄くする
+        alphas = (255 * self.lives[:self.count] / self.max_lives[:self.count]).astype(np.uint8)
+        colors = self.colors[:self.count]
+        pixels = pygame.surfarray.pixels3d(self.surface)
+        pixels_alpha = pygame.surfarray.pixels_alpha(self.surface)
+        for dx in range(size):
+            for dy in range(size):
+                pixels[points[:, 0] + dx, points[:, 1] + dy] = colors
+                pixels_alpha[points[:, 0] + dx, points[:, 1] + dy] = alphas
+        # サーフェスのロックを解除する
+        del pixels, pixels_alpha
+
+    def draw(self, screen):
+        """ 描画処理を行うメソッド """
+        if self.surface is not None:
+            screen.blit(self.surface, self.rect)
+
+    def handle_event(self, event):
+        pass
+
+
+class ShakeEffect:
+    """ 部品の描画位置を左右に揺らすクラス """
+
+    def __init__(self, target):
+        """
+        :param target: 揺らす部品(rectとmark_dirtyを持つもの)
+        """
+        self.target = target
+        # 現在ずらしている量
+        self.offset_x = 0
+        # 揺れ始めた時刻(揺れていない場合はNone)
+        self.start_time = None
+
+    def is_alive(self):
+        """ 揺れている途中かどうかを返すメソッド """
+        return self.start_time is not None
+
+    def start(self):
+        """ 揺れ始めるメソッド """
+        self.start_time = pygame.time.get_ticks()
+
+    def stop(self):
+        """ 揺れを止めて元の位置に戻すメソッド """
+        self.start_time = None
+        self.move_to(0)
+
+    def update(self):
+        """ 経過時間に応じてずらす量を計算し直すメソッド """
+        if self.start_time is None:
+            return
+        elapsed = pygame.time.get_ticks() - self.start_time
+        if elapsed >= sg.SHAKE_DURATION:
+            self.stop()
+            return
+        # 時間とともに小さくなる揺れ
+        decay = 1 - elapsed / sg.SHAKE_DURATION
+        amplitude = VIEWPORT.scale_length(sg.SHAKE_AMPLITUDE) * decay
+        self.move_to(round(amplitude * math.sin(elapsed / sg.SHAKE_DURATION * sg.SHAKE_COUNT * 2 * math.pi)))
+
+    def move_to(self, offset_x):
+        """
+        部品を元の位置から指定した量だけずらすメソッド
+        :param offset_x: 横方向にずらす量
+        """
+        if offset_x == self.offset_x:
+            return
+        self.target.mark_dirty()
+        self.target.rect.move_ip(offset_x - self.offset_x, 0)
+        self.offset_x = offset_x
+        self.target.mark_dirty()
+
+
+if __name__ == '__main__':
+    pass
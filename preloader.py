@@ -0,0 +1,73 @@
+from concurrent.futures import ThreadPoolExecutor
+import pygame
+
+# 別スレッドでの準備が終わったことをメインスレッドに知らせるイベント
+PRELOAD_FINISHED_EVENT = pygame.event.custom_type()
+
+
+class Preloader:
+    """
+    次に使う可能性が高いものを別スレッドで前もって作っておくクラス
+    別スレッドではファイルの読み込みなどpygameを使わない処理だけを行い、
+    サーフェスの作成はPRELOAD_FINISHED_EVENTを受け取った後にメインスレッドで行う
+    """
+
+    def __init__(self):
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        # 準備しているものを区別するキーと、その結果を受け取るFuture(準備していない場合はNone)
+        self.key = None
+        self.future = None
+
+    def request(self, key, build, *args):
+        """
+        別スレッドで準備を始めるメソッド(同じキーのものを準備済み・準備中なら何もしない)
+
+        :param key: 準備するものを区別するキー
+        :param build: 準備する関数
+        :param args: buildに渡す値
+        """
+        if self.key == key and self.future is not None:
+            return
+        # 前のキーのものはまだ始まっていなければ取り消す
+        if self.future is not None:
+            self.future.cancel()
+        self.key = key
+        self.future = self.executor.submit(build, *args)
+        self.future.add_done_callback(self.notify_finished)
+
+    def notify_finished(self, future):
+        """ 準備が終わったことをイベントで知らせるメソッド(別スレッドから呼ばれる) """
+        if not future.cancelled():
+            pygame.event.post(pygame.event.Event(PRELOAD_FINISHED_EVENT))
+
+    def peek(self, key):
+        """
+        準備が終わっていれば、受け取らずに結果を返すメソッド
+        :param key: 準備したものを区別するキー
+        :return: 結果(キーが違う・準備中・失敗した場合はNone)
+        """
+        if self.key != key or self.future is None or not self.future.done():
+            return None
+        if self.future.cancelled() or self.future.exception() is not None:
+            return None
+        return self.future.result()
+
+    def take(self, key):
+        """
+        結果を受け取るメソッド(準備中なら終わるまで待つ)
+        受け取った結果は次のrequestまで使えなくなる
+        :param key: 準備したものを区別するキー
+        :return: 結果(キーが違う・準備していない・失敗した場合はNone)
+        """
+        if self.key != key or self.future is None:
+            return None
+        future = self.future
+        self.key = None
+        self.future = None
+        if future.cancelled() or future.exception() is not None:
+            return None
+        return future.result()
+
+
+if __name__ == '__main__':
+    pass
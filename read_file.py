@@ -13,6 +13,19 @@ def load_settings(name):
         return settings.get(name)
 
 
-def read_txt_file(file_name):
+def read_deck_file(file_name):
+    """
+    単語帳のファイル(1行に「単語,品詞,意味」)を1行ずつ読み込むジェネレータ
+    :param file_name: 単語帳のパス
+    :return: (単語, 品詞, 意味)を順に返すジェネレータ
+    """
     with open(file_name, "r", encoding='utf-8') as f:
-        return [line.strip().split(',') for line in f]
+        for line_num, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            fields = line.split(',', 2)
+            if len(fields) != 3:
+                raise ValueError(f'{file_name}:{line_num}: expected "word,part,meaning": {line!r}')
+            yield tuple(fields)
+
@@ -0,0 +1,74 @@
+import pygame
+import setting as sg
+
+
+class Viewport:
+    """
+    論理解像度(SCREEN_WIDTH x SCREEN_HEIGHT)の座標・大きさをウィンドウ上の値に変換するクラス
+    縦横比を保ったまま拡大し、余った部分は左右または上下の余白にする
+    """
+
+    def __init__(self, logical_size):
+        """
+        :param logical_size: 論理解像度(width, height)
+        """
+        self.logical_width = logical_size[0]
+        self.logical_height = logical_size[1]
+        self.window_size = tuple(logical_size)
+        # 論理座標からウィンドウ座標への倍率
+        self.scale = 1.0
+        # 論理座標の原点のウィンドウ上の位置
+        self.offset_x = 0
+        self.offset_y = 0
+
+    def resize(self, window_size):
+        """
+        ウィンドウの大きさに合わせて倍率を計算し直すメソッド
+        :param window_size: ウィンドウの大きさ(width, height)
+        :return: 倍率・余白が変化したかどうか
+        """
+        window_size = tuple(window_size)
+        scale = min(window_size[0] / self.logical_width, window_size[1] / self.logical_height)
+        offset_x = (window_size[0] - round(self.logical_width * scale)) // 2
+        offset_y = (window_size[1] - round(self.logical_height * scale)) // 2
+        is_changed = (scale, offset_x, offset_y) != (self.scale, self.offset_x, self.offset_y)
+        self.window_size = window_size
+        self.scale = scale
+        self.offset_x = offset_x
+        self.offset_y = offset_y
+        return is_changed
+
+    def scale_length(self, length):
+        """ 長さを変換するメソッド(0より大きい長さは1ピクセル未満にしない) """
+        if length <= 0:
+            return 0
+        return max(1, round(length * self.scale))
+
+    def scale_font_size(self, font_size):
+        """ 文字の大きさを変換するメソッド """
+        return self.scale_length(font_size)
+
+    def scale_pos(self, pos):
+        """ 論理座標をウィンドウ座標に変換するメソッド """
+        return (round(pos[0] * self.scale) + self.offset_x,
+                round(pos[1] * self.scale) + self.offset_y)
+
+    def scale_size(self, size):
+        """ 大きさ(width, height)を変換するメソッド """
+        return self.scale_length(size[0]), self.scale_length(size[1])
+
+    def scale_rect(self, pos, size):
+        """ 論理座標の矩形をウィンドウ上の矩形に変換するメソッド """
+        return pygame.Rect(self.scale_pos(pos), self.scale_size(size))
+
+    def get_logical_rect(self):
+        """ 論理解像度の画面全体がウィンドウ上で占める矩形を返すメソッド """
+        return self.scale_rect((0, 0), (self.logical_width, self.logical_height))
+
+
+# プロセス全体で共有するビューポート
+VIEWPORT = Viewport((sg.SCREEN_WIDTH, sg.SCREEN_HEIGHT))
+
+
+if __name__ == '__main__':
+    pass
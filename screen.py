@@ -1,50 +1,118 @@
 import setting as sg
 from button import Button, ArrowButton
 from textbox import TextBox
-from label import Label, LoopLabel
+from label import Label, LoopLabel, BoundLabel, WrappedLabel
+from list_view import VirtualListView
 import pygame
-from game_system import StandardMode, EndlessMode, PracticeMode
-from sub_screen import OnBorderSubScreen
+from game_system import create_game_system
+from sub_screen import OnBorderSubScreen, ModalOverlay
 from surface import Surface
-from read_file import read_txt_file
-
-
-def read_variable_file(file_name):
-    with open(file_name, "r") as f:
-        data = f.readlines()
-    variables = {}
-    for line in data:
-        line = line.strip()  # 改行文字を削除
-        if "=" in line:
-            name, value = line.split("=")
-            name = name.strip()  # スペースを削除
-            value = value.strip()  # スペースを削除
-            try:
-                # 数値に変換できる場合は数値に変換する
-                value = int(value)
-            except ValueError:
-                try:
-                    value = float(value)
-                except ValueError:
-                    pass  # 数値に変換できない場合はそのままの値を使う
-            variables[name] = value
-    return variables
+from vocabulary_store import get_deck
+from layout import get_layout
+from dirty_rect import merge_rects
+from event_router import EventRouter
+from glyph_atlas import render_atlas_text
+from particle import ParticleSystem, ShakeEffect
+from dashboard import LineChart, BarChart, compute_statistics
+from preloader import Preloader, PRELOAD_FINISHED_EVENT
 
 
 def array_disassembly(array):
     return f'{array[0]} {array[1]} {array[2]}'
 
 
+def format_word_row(row):
+    """ 単語帳の1行分を表示する内容に変換する関数(行がない場合は空文字) """
+    if row is None:
+        return ''
+    return array_disassembly(row)
+
+
+class ScreenManager:
+    """
+    画面のインスタンスを使い回して画面を切り替えるクラス
+    画面は初めて表示する時に1回だけ作り、以降はon_exit・on_enterで表示ごとの状態を初期化する
+    """
+
+    def __init__(self, screen, change_screen_callback, sound_player, scheduler):
+        """
+        :param screen: ウィンドウ
+        :param change_screen_callback: 表示する画面が切り替わった時に呼ぶ関数
+        :param sound_player: SoundPlayerクラスのインスタンス
+        :param scheduler: FrameSchedulerクラスのインスタンス
+        """
+        self.screen = screen
+        self.change_screen_callback = change_screen_callback
+        self.sound_player = sound_player
+        self.scheduler = scheduler
+        # 画面のクラスをキーにした、作成済みの画面
+        self.pool = {}
+        # 表示中の画面
+        self.current_screen = None
+        # ウィンドウの大きさが変わるたびに増やす番号(画面ごとの配置が古いかどうかを判定する)
+        self.layout_version = 0
+
+    def get_screen(self, screen_class):
+        """
+        画面を返すメソッド(初めて使う時だけ作り、配置が古ければ計算し直す)
+        :param screen_class: 画面のクラス
+        :return: 画面のインスタンス
+        """
+        if screen_class not in self.pool:
+            self.pool[screen_class] = screen_class(self)
+        screen = self.pool[screen_class]
+        if screen.layout_version != self.layout_version:
+            screen.relayout(self.screen)
+        return screen
+
+    def enter(self, screen_class, *args):
+        """
+        表示中の画面から離れて指定した画面に入るメソッド
+        :param screen_class: 画面のクラス
+        :param args: 新しい画面のon_enterに渡す値
+        :return: 新しい画面
+        """
+        new_screen = self.get_screen(screen_class)
+        if self.current_screen is not None:
+            self.current_screen.on_exit()
+        self.current_screen = new_screen
+        new_screen.on_enter(*args)
+        return new_screen
+
+    def show(self, screen_class, *args):
+        """
+        画面を切り替えるメソッド
+        :param screen_class: 画面のクラス
+        :param args: 新しい画面のon_enterに渡す値
+        """
+        self.change_screen_callback(self.enter(screen_class, *args))
+
+    def relayout(self, screen):
+        """
+        ウィンドウの大きさが変わった時に表示中の画面だけを配置し直すメソッド
+        表示していない画面は次に表示する時に配置し直す
+        :param screen: 大きさが変わったウィンドウ
+        """
+        self.screen = screen
+        self.layout_version += 1
+        if self.current_screen is not None:
+            self.current_screen.relayout(screen)
+
+
 class BaseScreen:
     """ 画面作成のベースとなるクラス """
 
-    def __init__(self, screen, change_screen_callback, sound_player):
+    def __init__(self, screen_manager):
+        # 画面を切り替えるScreenManager
+        self.screen_manager = screen_manager
         # ウィンドウ
-        self.screen = screen
-        # コールバック関数
-        self.change_screen_callback = change_screen_callback
+        self.screen = screen_manager.screen
+        # どの大きさのウィンドウに合わせて配置したか(ScreenManagerのlayout_versionと比べる)
+        self.layout_version = screen_manager.layout_version
         # イベント処理をまとめて行うために格納しておくリスト
         self.EVENT_PARTS = []
+        # 値の変化を毎フレーム確認するBoundLabelのリスト
+        self.BOUND_PARTS = []
         # 難易度(デフォルトはnormal)
         self.difficulty = 'NORMAL'
         # ゲームモード(デフォルトはstandard)
@@ -52,48 +120,193 @@ class BaseScreen:
         # 現在の問題(何番目か)
         self.current_question = 0
         # SoundPlayerクラスのインスタンス変数
-        self.sound_player = sound_player
+        self.sound_player = screen_manager.sound_player
+        # フレームの残り時間で処理を進めるFrameScheduler
+        self.scheduler = screen_manager.scheduler
+        # 画面全体の再描画が必要かどうかのフラグ
+        self.is_all_dirty = True
+        # 静的な部品をまとめて描画しておく背景サーフェス
+        self.static_layer = None
+        # static_layerに焼き込んだ部品
+        self.static_parts = set()
+        # 開いているModalOverlay(開いていない場合はNone)
+        self.modal = None
+        # この画面で使うModalOverlayのリスト(開いていないものも含む)
+        self.OVERLAYS = []
+        # 部品が受け取るイベントの種類ごとにイベントを振り分けるEventRouter(必要になった時に作る)
+        self.router = None
+
+    def on_enter(self):
+        """ 画面を表示する時に呼ばれるメソッド(表示ごとに初期化する状態があれば上書きする) """
+        pass
+
+    def on_exit(self):
+        """ 画面から離れる時に呼ばれるメソッド(開いているオーバーレイを閉じ、ホバーを外す) """
+        self.close_modal()
+        if self.router is not None:
+            self.router.update_hover([])
 
     def on_event(self, event):
         """ イベント処理を行うメソッド """
-        for parts in self.EVENT_PARTS:
-            parts.handle_event(event)
+        # イベントの種類を受け取る部品だけに渡す(オーバーレイを開いている間は下の画面に渡さない)
+        self.get_router().dispatch(event)
+
+    def get_router(self):
+        """ イベントを振り分けるEventRouterを返すメソッド(初めて使う時に作る) """
+        if self.router is None:
+            self.router = EventRouter(self.EVENT_PARTS)
+            if self.modal is not None:
+                self.router.push_layer(self.modal.parts)
+        return self.router
+
+    def is_animating(self):
+        """ イベントがなくても描画を続ける必要があるかどうかを返すメソッド """
+        return False
+
+    def on_update(self):
+        """ 表示する値の変化を反映するメソッド """
+        for parts in self.BOUND_PARTS:
+            parts.refresh()
 
     def on_draw(self):
         """ 描画処理を行うメソッド """
+        self.render(self.screen)
+
+    def render(self, surface):
+        """
+        画面全体を描画するメソッド
+        :param surface: 描画先のサーフェス
+        """
+        if self.modal is not None:
+            self.modal.draw(surface)
+        else:
+            self.draw_parts(surface)
+
+    def draw_parts(self, surface):
+        """
+        画面の部品を描画するメソッド
+        :param surface: 描画先のサーフェス
+        """
+        # 静的な部品は背景サーフェスを1回blitするだけで描画する
+        surface.blit(self.get_static_layer(), (0, 0))
         for parts in self.EVENT_PARTS:
-            parts.draw(self.screen)
+            # 焼き込んでいない部品と、焼き込んだ時から見た目が変わった部品だけ描画する
+            if parts not in self.static_parts or not parts.is_static():
+                parts.draw(surface)
+
+    def open_modal(self, modal):
+        """
+        現在の画面を1回だけ描画してModalOverlayを開くメソッド
+        :param modal: 開くModalOverlay
+        """
+        # 先にオーバーレイのレイヤーを積んで、下の画面のホバーを外しておく
+        self.get_router().push_layer(modal.parts)
+        snapshot = pygame.Surface(self.screen.get_size()).convert()
+        self.draw_parts(snapshot)
+        modal.open(snapshot)
+        self.modal = modal
+        self.mark_all_dirty()
+
+    def close_modal(self):
+        """ 開いているModalOverlayを閉じるメソッド """
+        if self.modal is None:
+            return
+        self.modal.close()
+        self.modal = None
+        self.get_router().pop_layer()
+        self.mark_all_dirty()
+
+    def relayout(self, screen):
+        """
+        ウィンドウの大きさが変わった時だけ部品の位置と大きさを計算し直すメソッド
+        :param screen: 大きさが変わったウィンドウ
+        """
+        self.screen = screen
+        self.layout_version = self.screen_manager.layout_version
+        for parts in self.EVENT_PARTS:
+            parts.relayout()
+        for overlay in self.OVERLAYS:
+            overlay.relayout()
+        # 当たり判定は新しい配置で作り直す
+        if self.router is not None:
+            self.router.invalidate()
+        # 静的レイヤーは新しい大きさで作り直す
+        self.static_layer = None
+        # 開いているオーバーレイは新しい大きさの画面で開き直す
+        if self.modal is not None:
+            modal = self.modal
+            self.close_modal()
+            self.open_modal(modal)
+        self.mark_all_dirty()
+
+    def get_static_layer(self):
+        """ 静的レイヤーを返すメソッド(焼き込んだ部品の内容が変化していれば作り直す) """
+        if self.static_layer is None or any(parts.is_changed for parts in self.static_parts):
+            self.build_static_layer()
+        return self.static_layer
+
+    def build_static_layer(self):
+        """ 現在静的な部品を背景サーフェスに焼き込むメソッド """
+        if self.static_layer is None:
+            self.static_layer = pygame.Surface(self.screen.get_size()).convert()
+        self.static_layer.fill(sg.WHITE)
+        self.static_parts = set()
+        for parts in self.EVENT_PARTS:
+            parts.is_changed = False
+            if parts.is_static():
+                parts.draw(self.static_layer)
+                self.static_parts.add(parts)
+
+    def get_parts(self):
+        """ 描画する可能性のある部品をすべて返すメソッド """
+        if self.modal is not None:
+            return self.EVENT_PARTS + self.modal.parts
+        return self.EVENT_PARTS
+
+    def mark_all_dirty(self):
+        """ 次の描画で画面全体を再描画させるメソッド """
+        self.is_all_dirty = True
+
+    def get_dirty_rects(self):
+        """
+        前回の描画以降に変化した領域を返すメソッド
+        :return: 互いに重ならない矩形のリスト
+        """
+        dirty_rects = []
+        for parts in self.get_parts():
+            dirty_rects.extend(parts.pop_dirty_rects())
+        screen_rect = self.screen.get_rect()
+        if self.is_all_dirty:
+            self.is_all_dirty = False
+            return [screen_rect]
+        return merge_rects([rect.clip(screen_rect) for rect in dirty_rects])
 
     def go_title_screen(self):
         """ タイトル画面へ遷移するメソッド """
-        self.change_screen_callback(TitleScreen(self.screen, self.change_screen_callback, self.sound_player))
+        self.screen_manager.show(TitleScreen)
 
     def go_game_setting_screen(self):
         """ ゲーム設定画面へ遷移するメソッド """
-        self.change_screen_callback(GameSettingScreen(self.screen, self.change_screen_callback, self.sound_player))
+        self.screen_manager.show(GameSettingScreen)
 
     def go_game_play_screen(self):
         """ GamePlayScreenに切り替えるメソッド """
-        self.change_screen_callback(GamePlayScreen(self.screen, self.change_screen_callback,
-                                                   self.sound_player, self.difficulty, self.game_mode))
+        self.screen_manager.show(GamePlayScreen, self.difficulty, self.game_mode)
 
     def go_vocabulary_screen(self):
         """ 単語帳画面へ遷移するメソッド """
-        self.change_screen_callback(VocabularyScreen(self.screen, self.change_screen_callback, self.sound_player))
+        self.screen_manager.show(VocabularyScreen)
 
     def go_show_vocabulary_screen(self):
-        self.change_screen_callback(ShowVocabularyScreen(self.screen, self.change_screen_callback,
-                                                         self.sound_player, self.difficulty))
+        self.screen_manager.show(ShowVocabularyScreen, self.difficulty)
 
     def go_system_setting_screen(self):
         """ システム設定画面へ遷移するメソッド """
-        self.change_screen_callback(SystemSettingsScreen(self.screen, self.change_screen_callback, self.sound_player))
+        self.screen_manager.show(SystemSettingsScreen)
 
-    def go_game_score_screen(self, game_score, game_mistake, result_text):
+    def go_game_score_screen(self, game_score, game_mistake, result_text, answer_log=()):
         """ スコア画面へ遷移するメソッド """
-        self.change_screen_callback(GameScoreScreen(self.screen, self.change_screen_callback,
-                                                    self.sound_player,
-                                                    game_score, game_mistake, result_text))
+        self.screen_manager.show(GameScoreScreen, game_score, game_mistake, result_text, answer_log)
 
     def set_diff_easy(self):
         """ self.difficultyに'EASY'を格納するメソッド """
@@ -131,55 +344,55 @@ class BaseScreen:
 class TitleScreen(BaseScreen):
     """ タイトル画面を作成するクラス """
 
-    def __init__(self, screen, change_screen_callback, sound_player):
-        super().__init__(screen, change_screen_callback, sound_player)
-        # 各settingsをtxtファイルから読み込み,辞書型のdata変数に格納
-        self.data = read_variable_file('settings/TitleScreen.txt')
+    def __init__(self, screen_manager):
+        super().__init__(screen_manager)
+        # 起動時に読み込んだsettingsのレイアウトを取得
+        self.data = get_layout('TitleScreen')
         # タイトル
         self.label_title = Label(
             'PROGLISH',
-            self.data['label_title_font_size'],
+            self.data.label_title_font_size,
             sg.BLACK,
-            (self.data['label_title_x'],
-             self.data['label_title_y'])
+            (self.data.label_title_x,
+             self.data.label_title_y)
         )
         # ボタンの作成
         self.button_play = Button(
-            (self.data['button_play_x'],
-             self.data['button_play_y']),
-            (self.data['button_play_width'],
-             self.data['button_play_height']),
+            (self.data.button_play_x,
+             self.data.button_play_y),
+            (self.data.button_play_width,
+             self.data.button_play_height),
             'PLAY',
             sg.BUTTON_COLOR,
             sg.BUTTON_HOVER_COLOR,
             sg.WHITE,
-            self.data['button_play_font_size'],
+            self.data.button_play_font_size,
             self.go_game_setting_screen,
             self.sound_player
         )
         self.button_vocabulary = Button(
-            (self.data['button_vocabulary_x'],
-             self.data['button_vocabulary_y']),
-            (self.data['button_vocabulary_width'],
-             self.data['button_vocabulary_height']),
+            (self.data.button_vocabulary_x,
+             self.data.button_vocabulary_y),
+            (self.data.button_vocabulary_width,
+             self.data.button_vocabulary_height),
             '単語帳',
             sg.BUTTON_COLOR,
             sg.BUTTON_HOVER_COLOR,
             sg.WHITE,
-            self.data['button_vocabulary_font_size'],
+            self.data.button_vocabulary_font_size,
             self.go_vocabulary_screen,
             self.sound_player
         )
         self.button_system_settings = Button(
-            (self.data['button_system_settings_x'],
-             self.data['button_system_settings_y']),
-            (self.data['button_system_settings_width'],
-             self.data['button_system_settings_height']),
+            (self.data.button_system_settings_x,
+             self.data.button_system_settings_y),
+            (self.data.button_system_settings_width,
+             self.data.button_system_settings_height),
             '設定',
             sg.BUTTON_COLOR,
             sg.BUTTON_HOVER_COLOR,
             sg.WHITE,
-            self.data['button_system_settings_font_size'],
+            self.data.button_system_settings_font_size,
             self.go_system_setting_screen,
             self.sound_player
         )
@@ -193,137 +406,137 @@ class TitleScreen(BaseScreen):
 class GameSettingScreen(BaseScreen):
     """ ゲーム開始前の設定画面を作成するクラス """
 
-    def __init__(self, screen, change_screen_callback, sound_player):
-        super().__init__(screen, change_screen_callback, sound_player)
-        # 各settingsをtxtファイルから読み込み,辞書型のdata変数に格納
-        self.data = read_variable_file('settings/GameSettingScreen.txt')
+    def __init__(self, screen_manager):
+        super().__init__(screen_manager)
+        # 起動時に読み込んだsettingsのレイアウトを取得
+        self.data = get_layout('GameSettingScreen')
         # 現在選択されている難易度を表示するラベルの作成
         self.label_current_difficulty = Label(
             f'選択されている難易度：{self.difficulty}',
-            self.data['label_current_difficulty_font_size'],
+            self.data.label_current_difficulty_font_size,
             sg.BLACK,
-            (self.data['label_current_difficulty_x'],
-             self.data['label_current_difficulty_y'])
+            (self.data.label_current_difficulty_x,
+             self.data.label_current_difficulty_y)
         )
         # 現在選択されているゲームモードを表示するラベルの作成
         self.label_current_game_mode = Label(
             f'選択されているゲームモード：{self.game_mode}',
-            self.data['label_current_game_mode_font_size'],
+            self.data.label_current_game_mode_font_size,
             sg.BLACK,
-            (self.data['label_current_game_mode_x'],
-             self.data['label_current_game_mode_y'])
+            (self.data.label_current_game_mode_x,
+             self.data.label_current_game_mode_y)
         )
         # 難易度ラベルの作成
         self.label_difficulty = Label(
             '難易度',
-            self.data['label_difficulty_font_size'],
+            self.data.label_difficulty_font_size,
             sg.BLACK,
-            (self.data['label_difficulty_x'],
-             self.data['label_difficulty_y'])
+            (self.data.label_difficulty_x,
+             self.data.label_difficulty_y)
         )
         # EASYボタンの作成
         self.button_easy = Button(
-            (self.data['button_easy_x'],
-             self.data['button_easy_y']),
-            (self.data['button_diff_width'],
-             self.data['button_diff_height']),
+            (self.data.button_easy_x,
+             self.data.button_easy_y),
+            (self.data.button_diff_width,
+             self.data.button_diff_height),
             'EASY',
             sg.BUTTON_COLOR,
             sg.BUTTON_HOVER_COLOR,
             sg.WHITE,
-            self.data['button_diff_font_size'],
+            self.data.button_diff_font_size,
             self.change_diff_easy,
             self.sound_player
         )
         # NORMALボタンの作成
         self.button_normal = Button(
-            (self.data['button_normal_x'],
-             self.data['button_normal_y']),
-            (self.data['button_diff_width'],
-             self.data['button_diff_height']),
+            (self.data.button_normal_x,
+             self.data.button_normal_y),
+            (self.data.button_diff_width,
+             self.data.button_diff_height),
             'NORMAL',
             sg.BUTTON_COLOR,
             sg.BUTTON_HOVER_COLOR,
             sg.WHITE,
-            self.data['button_diff_font_size'],
+            self.data.button_diff_font_size,
             self.change_diff_normal,
             self.sound_player
         )
         # HARDボタンの作成
         self.button_hard = Button(
-            (self.data['button_hard_x'],
-             self.data['button_hard_y']),
-            (self.data['button_diff_width'],
-             self.data['button_diff_height']),
+            (self.data.button_hard_x,
+             self.data.button_hard_y),
+            (self.data.button_diff_width,
+             self.data.button_diff_height),
             'HARD',
             sg.BUTTON_COLOR,
             sg.BUTTON_HOVER_COLOR,
             sg.WHITE,
-            self.data['button_diff_font_size'],
+            self.data.button_diff_font_size,
             self.change_diff_hard,
             self.sound_player
         )
         # ゲームモードラベルの作成
         self.label_game_mode = Label(
             'ゲームモード',
-            self.data['label_game_mode_font_size'],
+            self.data.label_game_mode_font_size,
             sg.BLACK,
-            (self.data['label_game_mode_x'],
-             self.data['label_game_mode_y'])
+            (self.data.label_game_mode_x,
+             self.data.label_game_mode_y)
         )
         # PRACTICEボタンの作成
         self.button_practice = Button(
-            (self.data['button_practice_x'],
-             self.data['button_practice_y']),
-            (self.data['button_game_mode_width'],
-             self.data['button_game_mode_height']),
+            (self.data.button_practice_x,
+             self.data.button_practice_y),
+            (self.data.button_game_mode_width,
+             self.data.button_game_mode_height),
             'PRACTICE',
             sg.BUTTON_COLOR,
             sg.BUTTON_HOVER_COLOR,
             sg.WHITE,
-            self.data['button_game_mode_font_size'],
+            self.data.button_game_mode_font_size,
             self.change_game_mode_practice,
             self.sound_player
         )
         # STANDARDボタンの作成
         self.button_standard = Button(
-            (self.data['button_standard_x'],
-             self.data['button_standard_y']),
-            (self.data['button_game_mode_width'],
-             self.data['button_game_mode_height']),
+            (self.data.button_standard_x,
+             self.data.button_standard_y),
+            (self.data.button_game_mode_width,
+             self.data.button_game_mode_height),
             'STANDARD',
             sg.BUTTON_COLOR,
             sg.BUTTON_HOVER_COLOR,
             sg.WHITE,
-            self.data['button_game_mode_font_size'],
+            self.data.button_game_mode_font_size,
             self.change_game_mode_standard,
             self.sound_player
         )
         # ENDLESSボタンの作成
         self.button_endless = Button(
-            (self.data['button_endless_x'],
-             self.data['button_endless_y']),
-            (self.data['button_game_mode_width'],
-             self.data['button_game_mode_height']),
+            (self.data.button_endless_x,
+             self.data.button_endless_y),
+            (self.data.button_game_mode_width,
+             self.data.button_game_mode_height),
             'ENDLESS',
             sg.BUTTON_COLOR,
             sg.BUTTON_HOVER_COLOR,
             sg.WHITE,
-            self.data['button_game_mode_font_size'],
+            self.data.button_game_mode_font_size,
             self.change_game_mode_endless,
             self.sound_player
         )
         # GAME PLAYボタンの作成
         self.button_game_play = Button(
-            (self.data['button_game_play_x'],
-             self.data['button_game_play_y']),
-            (self.data['button_game_play_width'],
-             self.data['button_game_play_height']),
+            (self.data.button_game_play_x,
+             self.data.button_game_play_y),
+            (self.data.button_game_play_width,
+             self.data.button_game_play_height),
             'GAME PLAY',
             sg.BUTTON_COLOR,
             sg.BUTTON_HOVER_COLOR,
             sg.WHITE,
-            self.data['button_game_play_font_size'],
+            self.data.button_game_play_font_size,
             self.go_game_play_screen,
             self.sound_player
         )
@@ -354,44 +567,89 @@ class GameSettingScreen(BaseScreen):
                             self.button_back_title_screen,
                             ]
 
+        # 選択中の難易度・ゲームモードのゲームを別スレッドで前もって作っておく
+        self.preloader = Preloader()
+
+    def on_enter(self):
+        """ 表示するたびに難易度とゲームモードを初期値に戻すメソッド """
+        self.set_diff_normal()
+        self.set_game_mode_standard()
+        self.update_selection()
+
+    def on_event(self, event):
+        """ イベント処理を行うメソッド """
+        super().on_event(event)
+        # 別スレッドで作ったゲームの問題は、手が空いているフレームにメインスレッドで描画する
+        if event.type == PRELOAD_FINISHED_EVENT:
+            self.scheduler.add_task('finalize_preloaded_game', self.finalize_preloaded_game(),
+                                    sg.PRELOAD_GAME_PRIORITY)
+
+    def on_exit(self):
+        """ 前もって作ったゲームの問題を描画するタスクを取り消すメソッド """
+        self.scheduler.cancel('finalize_preloaded_game')
+        super().on_exit()
+
+    def update_selection(self):
+        """ 選択中の難易度・ゲームモードを表示し、そのゲームを前もって作り始めるメソッド """
+        self.label_current_difficulty.update_text(f'選択されている難易度：{self.difficulty}')
+        self.label_current_game_mode.update_text(f'選択されているゲームモード：{self.game_mode}')
+        self.preloader.request((self.difficulty, self.game_mode), create_game_system,
+                               self.difficulty, self.game_mode, self.sound_player)
+
+    def finalize_preloaded_game(self):
+        """ GamePlayScreenを用意し、前もって作ったゲームの最初の問題を描画しておくタスク """
+        if self.preloader.peek((self.difficulty, self.game_mode)) is None:
+            return
+        game_play_screen = self.screen_manager.get_screen(GamePlayScreen)
+        yield
+        # 描画している間に選択が変わった場合は何もしない
+        game_system = self.preloader.peek((self.difficulty, self.game_mode))
+        if game_system is not None:
+            yield from game_play_screen.prepare_first_question(game_system)
+
+    def go_game_play_screen(self):
+        """ 前もって作ったゲームがあればそれを使ってGamePlayScreenに切り替えるメソッド """
+        game_system = self.preloader.take((self.difficulty, self.game_mode))
+        self.screen_manager.show(GamePlayScreen, self.difficulty, self.game_mode, game_system)
+
     def change_diff_easy(self):
         """ 難易度に変更するメソッド """
         self.set_diff_easy()
-        self.label_current_difficulty.update_text(f'選択されている難易度：{self.difficulty}')
+        self.update_selection()
 
     def change_diff_normal(self):
         """ 難易度に変更するメソッド """
         self.set_diff_normal()
-        self.label_current_difficulty.update_text(f'選択されている難易度：{self.difficulty}')
+        self.update_selection()
 
     def change_diff_hard(self):
         """ 難易度に変更するメソッド """
         self.set_diff_hard()
-        self.label_current_difficulty.update_text(f'選択されている難易度：{self.difficulty}')
+        self.update_selection()
 
     def change_game_mode_standard(self):
         """ ゲームモードをスタンダードモードに変更するメソッド """
         self.set_game_mode_standard()
-        self.label_current_game_mode.update_text(f'選択されているゲームモード：{self.game_mode}')
+        self.update_selection()
 
     def change_game_mode_practice(self):
         """ ゲームモードをプラクティスモード変更するメソッド """
         self.set_game_mode_practice()
-        self.label_current_game_mode.update_text(f'選択されているゲームモード：{self.game_mode}')
+        self.update_selection()
 
     def change_game_mode_endless(self):
         """ ゲームモードをエンドレスモードに変更するメソッド """
         self.set_game_mode_endless()
-        self.label_current_game_mode.update_text(f'選択されているゲームモード：{self.game_mode}')
+        self.update_selection()
 
 
 class VocabularyScreen(BaseScreen):
     """ 単語帳の画面を作成するクラス """
 
-    def __init__(self, screen, change_screen_callback, sound_player):
-        super().__init__(screen, change_screen_callback, sound_player)
-        # 各settingsをtxtファイルから読み込み,辞書型のdata変数に格納
-        self.data = read_variable_file('settings/VocabularyScreen.txt')
+    def __init__(self, screen_manager):
+        super().__init__(screen_manager)
+        # 起動時に読み込んだsettingsのレイアウトを取得
+        self.data = get_layout('VocabularyScreen')
         # 戻るボタン
         self.button_back_title_screen = ArrowButton(
             sg.BUTTON_BACK_POS,
@@ -407,50 +665,50 @@ class VocabularyScreen(BaseScreen):
         # 説明ラベル
         self.label_description = Label(
             '各難易度に登場する単語を確認することができます。',
-            self.data['label_description_font_size'],
+            self.data.label_description_font_size,
             sg.BLACK,
-            (self.data['label_description_x'],
-             self.data['label_description_y'])
+            (self.data.label_description_x,
+             self.data.label_description_y)
         )
         # EASYボタンの作成
         self.button_easy = Button(
-            (self.data['button_easy_x'],
-             self.data['button_easy_y']),
-            (self.data['button_diff_width'],
-             self.data['button_diff_height']),
+            (self.data.button_easy_x,
+             self.data.button_easy_y),
+            (self.data.button_diff_width,
+             self.data.button_diff_height),
             'EASY',
             sg.BUTTON_COLOR,
             sg.BUTTON_HOVER_COLOR,
             sg.WHITE,
-            self.data['button_diff_font_size'],
+            self.data.button_diff_font_size,
             self.set_diff_easy,
             self.sound_player
         )
         # NORMALボタンの作成
         self.button_normal = Button(
-            (self.data['button_normal_x'],
-             self.data['button_normal_y']),
-            (self.data['button_diff_width'],
-             self.data['button_diff_height']),
+            (self.data.button_normal_x,
+             self.data.button_normal_y),
+            (self.data.button_diff_width,
+             self.data.button_diff_height),
             'NORMAL',
             sg.BUTTON_COLOR,
             sg.BUTTON_HOVER_COLOR,
             sg.WHITE,
-            self.data['button_diff_font_size'],
+            self.data.button_diff_font_size,
             self.set_diff_normal,
             self.sound_player
         )
         # HARDボタンの作成
         self.button_hard = Button(
-            (self.data['button_hard_x'],
-             self.data['button_hard_y']),
-            (self.data['button_diff_width'],
-             self.data['button_diff_height']),
+            (self.data.button_hard_x,
+             self.data.button_hard_y),
+            (self.data.button_diff_width,
+             self.data.button_diff_height),
             'HARD',
             sg.BUTTON_COLOR,
             sg.BUTTON_HOVER_COLOR,
             sg.WHITE,
-            self.data['button_diff_font_size'],
+            self.data.button_diff_font_size,
             self.set_diff_hard,
             self.sound_player
         )
@@ -475,14 +733,11 @@ class VocabularyScreen(BaseScreen):
 
 
 class ShowVocabularyScreen(BaseScreen):
-    def __init__(self, screen, change_screen_callback, sound_player, diff):
-        super().__init__(screen, change_screen_callback, sound_player)
-        self.vocabulary = read_txt_file(f'vocabulary/{diff}.txt')
-        self.data = read_variable_file('settings/ShowVocabularyScreen.txt')
-        # 大文字に変換して保持
-        self.diff = diff.upper()
-        # 現在のページ(初期値は1)
-        self.current_page = 1
+    def __init__(self, screen_manager):
+        super().__init__(screen_manager)
+        self.data = get_layout('ShowVocabularyScreen')
+        # 表示中の難易度(on_enterで設定する)
+        self.diff = ''
         # 戻るボタンの作成
         self.button_back_vocabulary_screen = ArrowButton(
             sg.BUTTON_BACK_POS,
@@ -497,435 +752,388 @@ class ShowVocabularyScreen(BaseScreen):
         )
         # 難易度ラベル
         self.label_diff = Label(
-            self.diff,
-            self.data['label_diff_font_size'],
-            sg.BLACK,
-            (self.data['label_diff_x'],
-             self.data['label_diff_y'])
-        )
-        self.label_words_1 = Label(
-            '更新されていません',
-            self.data['label_words_font_size'],
-            sg.BLACK,
-            (self.data['label_words_1_x'],
-             self.data['label_words_1_y'])
-        )
-        self.label_words_2 = Label(
-            '更新されていません',
-            self.data['label_words_font_size'],
-            sg.BLACK,
-            (self.data['label_words_2_x'],
-             self.data['label_words_2_y'])
-        )
-        self.label_words_3 = Label(
-            '更新されていません',
-            self.data['label_words_font_size'],
-            sg.BLACK,
-            (self.data['label_words_3_x'],
-             self.data['label_words_3_y'])
-        )
-        self.label_words_4 = Label(
-            '更新されていません',
-            self.data['label_words_font_size'],
-            sg.BLACK,
-            (self.data['label_words_4_x'],
-             self.data['label_words_4_y'])
-        )
-        self.label_words_5 = Label(
-            '更新されていません',
-            self.data['label_words_font_size'],
-            sg.BLACK,
-            (self.data['label_words_5_x'],
-             self.data['label_words_5_y'])
-        )
-        self.label_words_6 = Label(
-            '更新されていません',
-            self.data['label_words_font_size'],
-            sg.BLACK,
-            (self.data['label_words_6_x'],
-             self.data['label_words_6_y'])
-        )
-        self.label_words_7 = Label(
-            '更新されていません',
-            self.data['label_words_font_size'],
-            sg.BLACK,
-            (self.data['label_words_7_x'],
-             self.data['label_words_7_y'])
-        )
-        self.label_words_8 = Label(
-            '更新されていません',
-            self.data['label_words_font_size'],
-            sg.BLACK,
-            (self.data['label_words_8_x'],
-             self.data['label_words_8_y'])
-        )
-        self.label_words_9 = Label(
-            '更新されていません',
-            self.data['label_words_font_size'],
+            '',
+            self.data.label_diff_font_size,
             sg.BLACK,
-            (self.data['label_words_9_x'],
-             self.data['label_words_9_y'])
+            (self.data.label_diff_x,
+             self.data.label_diff_y)
         )
-        self.label_words_10 = Label(
-            '更新されていません',
-            self.data['label_words_font_size'],
+        # 単語一覧(表示範囲の行だけを描画する)
+        self.list_view_words = VirtualListView(
+            (self.data.list_view_words_x,
+             self.data.list_view_words_y),
+            (self.data.list_view_words_width,
+             self.data.list_view_words_height),
+            self.data.list_view_words_row_height,
+            self.data.label_words_font_size,
             sg.BLACK,
-            (self.data['label_words_10_x'],
-             self.data['label_words_10_y'])
+            [],
+            format_word_row
         )
         # 前のページボタン
         self.button_back_page = Button(
-            (self.data['button_back_page_x'],
-             self.data['button_back_page_y']),
-            (self.data['button_back_page_width'],
-             self.data['button_back_page_height']),
+            (self.data.button_back_page_x,
+             self.data.button_back_page_y),
+            (self.data.button_back_page_width,
+             self.data.button_back_page_height),
             '前のページ',
             sg.BUTTON_COLOR,
             sg.BUTTON_HOVER_COLOR,
             sg.BLACK,
-            self.data['button_back_page_font_size'],
+            self.data.button_back_page_font_size,
             self.sub_current_page,
             self.sound_player
         )
         # 次のページボタン
         self.button_next_page = Button(
-            (self.data['button_next_page_x'],
-             self.data['button_next_page_y']),
-            (self.data['button_next_page_width'],
-             self.data['button_next_page_height']),
+            (self.data.button_next_page_x,
+             self.data.button_next_page_y),
+            (self.data.button_next_page_width,
+             self.data.button_next_page_height),
             '次のページ',
             sg.BUTTON_COLOR,
             sg.BUTTON_HOVER_COLOR,
             sg.BLACK,
-            self.data['button_next_page_font_size'],
+            self.data.button_next_page_font_size,
             self.add_current_page,
             self.sound_player
         )
-        self.label_page = Label(
-            '更新されてません',
-            self.data['label_page_font_size'],
+        self.label_page = BoundLabel(
+            self.get_page_state,
+            self.format_page_state,
+            self.data.label_page_font_size,
             sg.BLACK,
-            (self.data['label_page_x'],
-             self.data['label_page_y'])
+            (self.data.label_page_x,
+             self.data.label_page_y)
         )
         self.EVENT_PARTS = [self.button_back_vocabulary_screen,
                             self.label_diff,
-                            self.label_words_1,
-                            self.label_words_2,
-                            self.label_words_3,
-                            self.label_words_4,
-                            self.label_words_5,
-                            self.label_words_6,
-                            self.label_words_7,
-                            self.label_words_8,
-                            self.label_words_9,
-                            self.label_words_10,
+                            self.list_view_words,
                             self.button_back_page,
                             self.button_next_page,
                             self.label_page
                             ]
-        self.labels_words = [self.label_words_1,
-                             self.label_words_2,
-                             self.label_words_3,
-                             self.label_words_4,
-                             self.label_words_5,
-                             self.label_words_6,
-                             self.label_words_7,
-                             self.label_words_8,
-                             self.label_words_9,
-                             self.label_words_10,
-                             ]
+        self.BOUND_PARTS = [self.label_page]
+
+    def on_enter(self, diff):
+        """
+        表示する難易度の単語帳を1ページ目から表示するメソッド
+        :param diff: 難易度
+        """
+        # 大文字に変換して保持
+        self.diff = diff.upper()
+        self.label_diff.update_text(self.diff)
+        # 単語帳はゲームと共有し、ファイルが変わった時だけ読み込み直される
+        self.list_view_words.set_items(get_deck(self.diff))
+        self.update_page_buttons()
 
     def on_event(self, event):
         super().on_event(event)
+        self.update_page_buttons()
+
+    def update_page_buttons(self):
+        """ 現在のページに応じてページ送りボタンのイベント処理を切り替えるメソッド """
         # 1ページ目なら「前のページ」ボタンのイベント処理をしない
         if self.get_current_page() == 1:
             self.button_back_page.is_event_false()
+        else:
+            self.button_back_page.is_event_true()
         # 最後のページなら「次のページ」ボタンのイベント処理をしない
-        elif self.get_current_page() == len(self.vocabulary) // 10:
+        if self.get_current_page() == self.list_view_words.get_page_count():
             self.button_next_page.is_event_false()
-        # それ以外のページならイベント処理をする
         else:
             self.button_next_page.is_event_true()
-            self.button_back_page.is_event_true()
 
-    def on_draw(self):
-        super().on_draw()
-        self.update_label_words()
-        self.update_label_page()
-
-    def update_label_words(self):
-        """ labels_words内のlabel変数のテキストを更新するメソッド """
-        for i, label in enumerate(self.labels_words):
-            label.update_text(array_disassembly(self.vocabulary[(self.get_current_page()-1) * 10 + i]))
+    def get_page_state(self):
+        """ (現在のページ, 全ページ数)を返すメソッド """
+        return self.get_current_page(), self.list_view_words.get_page_count()
 
-    def update_label_page(self):
-        """ label_pageのテキストを更新するメソッド """
-        self.label_page.update_text(
-            f'{self.get_current_page()}/{(len(self.vocabulary)//10)}ページ')
+    @staticmethod
+    def format_page_state(page_state):
+        """ (現在のページ, 全ページ数)を表示する内容に変換するメソッド """
+        return f'{page_state[0]}/{page_state[1]}ページ'
 
     def get_current_page(self):
-        """ current_pageを返すメソッド """
-        return self.current_page
+        """ 現在のページを返すメソッド """
+        return self.list_view_words.get_page()
 
     def add_current_page(self):
-        """ current_pageを+1するメソッド """
-        if len(self.vocabulary) == self.get_current_page()*10:
-            pass
-        else:
-            self.current_page += 1
+        """ 次のページへ進むメソッド """
+        self.list_view_words.page_down()
 
     def sub_current_page(self):
-        """ current_pageを-1するメソッド """
-        if self.get_current_page() == 1:
-            pass
-        else:
-            self.current_page -= 1
+        """ 前のページへ戻るメソッド """
+        self.list_view_words.page_up()
 
 
 class GamePlayScreen(BaseScreen):
     """ ゲーム中の画面を作成するクラス """
 
-    def __init__(self, screen, change_screen_callback, sound_player, difficulty, game_mode):
-        super().__init__(screen, change_screen_callback, sound_player)
-        # 各settingsをtxtファイルから読み込み,辞書型のdata変数に格納
-        self.data = read_variable_file('settings/GamePlayScreen.txt')
-        # 難易度セット
-        self.judge_diff(difficulty)
-        # ゲームモードセット
-        self.judge_game_mode(game_mode)
+    def __init__(self, screen_manager):
+        super().__init__(screen_manager)
+        # 起動時に読み込んだsettingsのレイアウトを取得
+        self.data = get_layout('GamePlayScreen')
         # メニューボタンのフラグ
         self.button_menu_flg = False
-        # インスタンス変数を生成
-        self.game_system = self.create_game_mode_inst()
-        # 使用する問題リストを格納
-        self.random_question_list = self.game_system.get_random_list()
+        # ゲームのインスタンスと使用する問題リスト(on_enterで作成する)
+        self.game_system = None
+        self.random_question_list = []
         # 残りライフを表示するラべルの作成
         self.label_current_life = LoopLabel(
             chr(0x2665),
-            self.data['label_current_life_font_size'],
+            self.data.label_current_life_font_size,
             sg.RED,
-            (self.data['label_current_life_x'],
-             self.data['label_current_life_y']),
-            self.game_system.get_life()
+            (self.data.label_current_life_x,
+             self.data.label_current_life_y),
+            0
         )
         # 回答欄の作成
         self.text_box_answer = TextBox(
-            (self.data['text_box_answer_x'],
-             self.data['text_box_answer_y']),
-            (self.data['text_box_answer_width'],
-             self.data['text_box_answer_height']),
-            self.data['text_box_answer_font_size'],
+            (self.data.text_box_answer_x,
+             self.data.text_box_answer_y),
+            (self.data.text_box_answer_width,
+             self.data.text_box_answer_height),
+            self.data.text_box_answer_font_size,
             sg.BLACK,
             sg.BLACK
         )
-        # 問題文(品詞)の作成
+        # 問題文(品詞)の作成(問題ごとに変わるのでアトラスから組み立てる)
         self.label_parts = Label(
-            self.random_question_list[self.get_current_question()][sg.PART_NUM],
-            self.data['label_parts_font_size'],
+            '',
+            self.data.label_parts_font_size,
             sg.BLACK,
-            (self.data['label_parts_x'],
-             self.data['label_parts_y']))
-        # 問題文(意味)の作成
-        self.label_question = Label(
-            self.random_question_list[self.get_current_question()][sg.MEAN_NUM],
-            self.data['label_question_font_size'],
+            (self.data.label_parts_x,
+             self.data.label_parts_y),
+            render_atlas_text)
+        # 問題文(意味)の作成(問題ごとに変わるのでアトラスから組み立てる)
+        # 長い意味は領域の幅で折り返し、収まらなければ文字を小さくする
+        self.label_question = WrappedLabel(
+            '',
+            self.data.label_question_font_size,
             sg.BLACK,
-            (self.data['label_question_x'],
-             self.data['label_question_y']))
+            (self.data.label_question_x,
+             self.data.label_question_y),
+            (self.data.label_question_width,
+             self.data.label_question_height),
+            render_atlas_text)
         # メニューボタンの作成
         self.button_menu = Button(
-            (self.data['button_menu_x'],
-             self.data['button_menu_y']),
-            (self.data['button_menu_width'],
-             self.data['button_menu_height']),
+            (self.data.button_menu_x,
+             self.data.button_menu_y),
+            (self.data.button_menu_width,
+             self.data.button_menu_height),
             'Menu',
             sg.BUTTON_COLOR,
             sg.BUTTON_HOVER_COLOR,
             sg.WHITE,
-            self.data['button_menu_font_size'],
+            self.data.button_menu_font_size,
             self.view_button_menu,
             self.sound_player
         )
-        # グレーのサーフェスを作成
+        # グレーのサーフェスを作成(余白を含めたウィンドウ全体を覆う)
         self.gray_surface = Surface(
             (sg.SCREEN_WIDTH, sg.SCREEN_HEIGHT),
             sg.GRAY,
-            self.data['gray_surface_alpha']
+            self.data.gray_surface_alpha,
+            cover_window=True
         )
         # サブスクリーンの作成
         self.sub_screen = OnBorderSubScreen(
-            screen,
-            (self.data['sub_screen_width'],
-             self.data['sub_screen_height']),
+            self.screen,
+            (self.data.sub_screen_width,
+             self.data.sub_screen_height),
             sg.WHITE,
-            self.data['sub_screen_border_width'],
+            self.data.sub_screen_border_width,
             sg.BLACK
         )
         # サブスクリーンに表示するボタン
         # プレイを続けるボタンを作成
         self.button_back_game_play_screen = Button(
-            (self.data['button_back_game_play_screen_x'],
-             self.data['button_back_game_play_screen_y']),
-            (self.data['button_back_game_play_screen_width'],
-             self.data['button_back_game_play_screen_height']),
+            (self.data.button_back_game_play_screen_x,
+             self.data.button_back_game_play_screen_y),
+            (self.data.button_back_game_play_screen_width,
+             self.data.button_back_game_play_screen_height),
             'プレイを続ける',
             sg.BUTTON_COLOR,
             sg.BUTTON_HOVER_COLOR,
             sg.WHITE,
-            self.data['button_back_game_play_screen_font_size'],
+            self.data.button_back_game_play_screen_font_size,
             self.button_menu_flg_false,
             self.sound_player
         )
         # ゲーム設定へ戻るボタンを作成
         self.button_back_game_setting_screen = Button(
-            (self.data['button_back_game_setting_screen_x'],
-             self.data['button_back_game_setting_screen_y']),
-            (self.data['button_back_game_setting_screen_width'],
-             self.data['button_back_game_setting_screen_height']),
+            (self.data.button_back_game_setting_screen_x,
+             self.data.button_back_game_setting_screen_y),
+            (self.data.button_back_game_setting_screen_width,
+             self.data.button_back_game_setting_screen_height),
             'ゲーム設定へ戻る',
             sg.BUTTON_COLOR,
             sg.BUTTON_HOVER_COLOR,
             sg.WHITE,
-            self.data['button_back_game_setting_screen_font_size'],
+            self.data.button_back_game_setting_screen_font_size,
             self.go_game_setting_screen,
             self.sound_player
         )
         # タイトルへ戻るボタンを作成
         self.button_back_title_screen = Button(
-            (self.data['button_back_title_screen_x'],
-             self.data['button_back_title_screen_y']),
-            (self.data['button_back_title_screen_width'],
-             self.data['button_back_title_screen_height']),
+            (self.data.button_back_title_screen_x,
+             self.data.button_back_title_screen_y),
+            (self.data.button_back_title_screen_width,
+             self.data.button_back_title_screen_height),
             'タイトルへ戻る',
             sg.BUTTON_COLOR,
             sg.BUTTON_HOVER_COLOR,
             sg.WHITE,
-            self.data['button_back_title_screen_font_size'],
+            self.data.button_back_title_screen_font_size,
             self.go_title_screen,
             self.sound_player
         )
+        # 正解した時に放出するパーティクル
+        self.particles = ParticleSystem(sg.PARTICLE_MAX)
+        # 不正解の時に回答欄を揺らす
+        self.shake_text_box = ShakeEffect(self.text_box_answer)
         self.EVENT_PARTS = [self.label_current_life,
                             self.text_box_answer,
                             self.label_parts,
                             self.label_question,
                             self.button_menu,
-                            self.gray_surface,
-                            self.sub_screen,
+                            self.particles,
                             ]
         # サブスクリーンに表示されるボタンを格納したリスト
         self.SUB_SCREEN_PARTS = [self.button_back_game_play_screen,
                                  self.button_back_game_setting_screen,
                                  self.button_back_title_screen,
                                  ]
+        # メニューを開いた時に画面に重ねるオーバーレイ
+        self.menu_overlay = ModalOverlay(self.gray_surface, self.sub_screen, self.SUB_SCREEN_PARTS)
+        self.OVERLAYS = [self.menu_overlay]
+        # サブスクリーンは非表示の状態で開始する
+        self.menu_overlay.close()
+
+    def on_enter(self, difficulty, game_mode, game_system=None):
+        """
+        表示するたびに新しいゲームを始めるメソッド
+        :param difficulty: 難易度
+        :param game_mode: ゲームモード
+        :param game_system: 前もって作ったゲームのインスタンス(ない場合はここで作る)
+        """
+        # 難易度セット
+        self.judge_diff(difficulty)
+        # ゲームモードセット
+        self.judge_game_mode(game_mode)
+        # インスタンス変数を生成
+        if game_system is None:
+            game_system = self.create_game_mode_inst()
+        self.game_system = game_system
+        self.game_system.start_timer()
+        # 使用する問題リストを格納
+        self.random_question_list = self.game_system.get_random_list()
+        self.current_question = 0
+        self.label_current_life.update_loop_num(self.game_system.get_life())
+        self.text_box_answer.clear_text()
+        self.update_question()
+        # 次の問題を前もって描画しておく
+        self.schedule_next_question()
+
+    def on_exit(self):
+        """ メニュー・パーティクル・揺れ・前もって描画するタスクを片付けるメソッド """
+        if self.button_menu_flg:
+            self.button_menu_flg_false()
+        self.shake_text_box.stop()
+        self.particles.clear()
+        self.scheduler.cancel('prepare_next_question')
+        super().on_exit()
 
     def on_event(self, event):
         """ イベント処理を行うメソッド """
         super().on_event(event)
-        # button_menu_flgがTrueの場合
+        # メニューを開いている間はオーバーレイがイベントを受け付けるので回答を受け付けない
         if self.button_menu_flg:
-            # text_boxのイベント処理を停止する(キー入力ができなくなる)
-            self.text_box_answer.is_active_false()
-            # button_menuのイベント処理を停止する
-            self.button_menu.is_event_false()
-            # button_back_game_play_screenのイベント処理を受け付ける
-            for parts in self.SUB_SCREEN_PARTS:
-                parts.is_event_true()
-                parts.handle_event(event)
-        # button_menu_flgがFalseの場合
-        else:
-            # text_boxのイベント処理を受け付ける(キー入力を受けつける)
-            self.text_box_answer.is_active_true()
-            # button_menuのイベント処理を受け付ける(クリック入力を受けつける)
-            self.button_menu.is_event_true()
-            # button_back_game_play_screenのイベント処理を停止する
-            for parts in self.SUB_SCREEN_PARTS:
-                parts.is_event_false()
-
-            # キー入力が行われた場合
-            if event.type == pygame.KEYDOWN:
-                # Enterキーが押された場合
-                if event.key == pygame.K_RETURN:
-                    # 正誤判定
-                    self.game_system.check_answer(
-                        self.text_box_answer.get_text(), self.get_current_question())
-                    # lifeチェック
-                    self.label_current_life.update_loop_num(self.game_system.get_life())
-                    # 残りライフ確認
-                    if self.game_system.check_life():
-                        # ライフが0ならゲームオーバーとしてスコア画面へ遷移する
+            return
+        # キー入力が行われた場合
+        if event.type == pygame.KEYDOWN:
+            # Enterキーが押された場合
+            if event.key == pygame.K_RETURN:
+                # 正誤判定
+                is_correct = self.game_system.check_answer(
+                    self.text_box_answer.get_text(), self.get_current_question())
+                # 正解ならパーティクルを放出し、不正解なら回答欄を揺らす
+                if is_correct:
+                    self.particles.emit(self.text_box_answer.rect.center,
+                                        sg.PARTICLE_BURST_COUNT, sg.PARTICLE_COLORS)
+                else:
+                    self.shake_text_box.start()
+                # lifeチェック
+                self.label_current_life.update_loop_num(self.game_system.get_life())
+                # 残りライフ確認
+                if self.game_system.check_life():
+                    # ライフが0ならゲームオーバーとしてスコア画面へ遷移する
+                    self.go_game_score_screen(
+                        self.game_system.get_score(),
+                        self.game_system.get_mistake(),
+                        'GAME OVER!',
+                        self.game_system.get_answer_log()
+                    )
+                    return
+                # 次の問題を参照するためにcurrent_questionを+1する
+                self.add_current_question()
+                # 次の問題の有無によって変える
+                # あるなら次の問題へ
+                if self.game_system.check_next_question(self.get_current_question()):
+                    # 回答欄をクリアする
+                    self.text_box_answer.clear_text()
+                    # 次の問題へ
+                    self.update_question()
+                    self.schedule_next_question()
+                # ないならスコア画面へ
+                else:
+                    # プラクティスモードの場合
+                    if self.game_system.get_practice_flg():
+                        # 練習終了としてスコア画面へ遷移する
                         self.go_game_score_screen(
                             self.game_system.get_score(),
                             self.game_system.get_mistake(),
-                            'GAME OVER!'
+                            'PRACTICE FINISH!',
+                            self.game_system.get_answer_log()
                         )
+                    # それ以外の場合
                     else:
-                        pass
-                    # 次の問題を参照するためにcurrent_questionを+1する
-                    self.add_current_question()
-                    # 次の問題の有無によって変える
-                    # あるなら次の問題へ
-                    if self.game_system.check_next_question(self.get_current_question()):
-                        # 回答欄をクリアする
-                        self.text_box_answer.clear_text()
-                        # 次の問題へ
-                        self.update_question()
-                    # ないならスコア画面へ
-                    else:
-                        # プラクティスモードの場合
-                        if self.game_system.get_practice_flg():
-                            # 練習終了としてスコア画面へ遷移する
-                            self.go_game_score_screen(
-                                self.game_system.get_score(),
-                                self.game_system.get_mistake(),
-                                'PRACTICE FINISH!',
-                            )
-                        # それ以外の場合
-                        else:
-                            # ゲームクリアとしてスコア画面へ遷移する
-                            self.go_game_score_screen(
-                                self.game_system.get_score(),
-                                self.game_system.get_mistake(),
-                                'GAME CLEAR!',
-                            )
-
-                # Enterキー以外は何もしない
-                else:
-                    pass
-            # キー入力以外は何もしない
+                        # ゲームクリアとしてスコア画面へ遷移する
+                        self.go_game_score_screen(
+                            self.game_system.get_score(),
+                            self.game_system.get_mistake(),
+                            'GAME CLEAR!',
+                            self.game_system.get_answer_log()
+                        )
+
+            # Enterキー以外は何もしない
             else:
                 pass
-
-    def on_draw(self):
-        """
-        描画処理を行うメソッド
-        button_menu_flgがTrue: button_menuを描画せず,サブスクリーンを描画する
-        button_menu_flgがFalse: button_menuを描画して,サブスクリーンは描画しない
-        """
-        super().on_draw()
-        # button_menu_flgがTrueの場合
-        if self.button_menu_flg:
-            # button_menuを描画
-            self.button_menu.is_draw_false()
-            # self.gray_surfaceを描画
-            self.gray_surface.is_active_true()
-            # self.sub_screenを描画
-            self.sub_screen.is_active_true()
-            # 各種ボタンを描画
-            for parts in self.SUB_SCREEN_PARTS:
-                parts.is_draw_true()
-                parts.draw(self.screen)
-        # button_menu_flgがFalseの場合
+        # キー入力以外は何もしない
         else:
-            # button_menuを描画
-            self.button_menu.is_draw_true()
-            # self.gray_surfaceを非表示
-            self.gray_surface.is_active_false()
-            # self.sub_screenを非表示
-            self.sub_screen.is_active_false()
-            # 各種ボタンを非表示
-            for parts in self.SUB_SCREEN_PARTS:
-                parts.is_draw_false()
+            pass
+
+    def is_animating(self):
+        """ パーティクルか揺れが残っている間は描画を続ける """
+        return self.particles.is_alive() or self.shake_text_box.is_alive()
+
+    def on_update(self):
+        """ 表示する値の変化とパーティクル・揺れを反映するメソッド """
+        super().on_update()
+        # メニューを開いている間は止めておく
+        if self.modal is not None:
+            return
+        self.particles.update(self.screen.get_rect())
+        self.shake_text_box.update()
+
+    def relayout(self, screen):
+        """ 配置を計算し直す前に揺れとパーティクルを止めるメソッド """
+        self.shake_text_box.stop()
+        self.particles.clear()
+        super().relayout(screen)
+        # 前もって描画しておいた問題は大きさが変わったので描画し直す
+        self.schedule_next_question()
 
     def judge_diff(self, diff):
         if diff == 'EASY':
@@ -954,24 +1162,59 @@ class GamePlayScreen(BaseScreen):
             self.button_menu_flg_true()
 
     def button_menu_flg_true(self):
-        """ button_menu_flg変数にTrueを格納するメソッド """
+        """
+        button_menu_flg変数にTrueを格納するメソッド
+        button_menuを描画せず,サブスクリーンを描画する
+        """
         self.button_menu_flg = True
+        # button_menuを非表示
+        self.button_menu.is_draw_false()
+        # ゲーム画面を1回だけ描画してサブスクリーンを重ねる
+        self.open_modal(self.menu_overlay)
 
     def button_menu_flg_false(self):
-        """ button_menu_flg変数にFalseを格納するメソッド """
+        """
+        button_menu_flg変数にFalseを格納するメソッド
+        button_menuを描画して,サブスクリーンは描画しない
+        """
         self.button_menu_flg = False
+        # サブスクリーンを閉じる
+        self.close_modal()
+        # button_menuを描画
+        self.button_menu.is_draw_true()
 
     def create_game_mode_inst(self):
         """
         選択されたgame_modeに沿ったインスタンスを生成し、返すメソッド
         :return: インスタンス
         """
-        if self.game_mode == 'STANDARD':
-            return StandardMode(self.difficulty, self.sound_player)
-        elif self.game_mode == 'PRACTICE':
-            return PracticeMode(self.difficulty, self.sound_player)
-        elif self.game_mode == 'ENDLESS':
-            return EndlessMode(self.difficulty, self.sound_player)
+        return create_game_system(self.difficulty, self.game_mode, self.sound_player)
+
+    def schedule_next_question(self):
+        """ 次の問題を前もって描画するタスクを登録するメソッド """
+        self.scheduler.add_task('prepare_next_question', self.prepare_next_question(),
+                                sg.PREPARE_NEXT_QUESTION_PRIORITY)
+
+    def prepare_first_question(self, game_system):
+        """
+        前もって作ったゲームの最初の問題の品詞と意味を1つずつ描画しておくタスク
+        :param game_system: 前もって作ったゲームのインスタンス
+        """
+        question = game_system.get_random_list()[0]
+        self.label_parts.prepare_text(question[sg.PART_NUM])
+        yield
+        self.label_question.prepare_text(question[sg.MEAN_NUM])
+
+    def prepare_next_question(self):
+        """ 次の問題の品詞と意味を1つずつ前もって描画するタスク """
+        next_question = self.get_current_question() + 1
+        if not self.game_system.check_next_question(next_question):
+            return
+        question = self.random_question_list[next_question]
+        self.label_parts.prepare_text(question[sg.PART_NUM])
+        yield
+        self.label_question.prepare_text(question[sg.MEAN_NUM])
+        yield
 
     def update_question(self):
         """ 問題文を更新するメソッド """
@@ -987,77 +1230,140 @@ class GamePlayScreen(BaseScreen):
 class GameScoreScreen(BaseScreen):
     """ スコア画面を作成するクラス """
 
-    def __init__(self, screen, change_screen_callback, sound_player, game_score, game_mistake, result_text):
-        super().__init__(screen, change_screen_callback, sound_player)
-        # 各settingsをtxtファイルから読み込み,辞書型のdata変数に格納
-        self.data = read_variable_file('settings/GameScoreScreen.txt')
+    def __init__(self, screen_manager):
+        super().__init__(screen_manager)
+        # 起動時に読み込んだsettingsのレイアウトを取得
+        self.data = get_layout('GameScoreScreen')
         # リザルトラベルを作成
         self.label_result = Label(
-            result_text,
-            self.data['label_result_font_size'],
+            '',
+            self.data.label_result_font_size,
             sg.BLACK,
-            (self.data['label_result_x'],
-             self.data['label_result_y'])
+            (self.data.label_result_x,
+             self.data.label_result_y)
         )
         # 直前のゲームのスコアを表示するラベルを作成
         self.label_game_score = Label(
-            f'スコア：{game_score}点',
-            self.data['label_game_score_font_size'],
+            '',
+            self.data.label_game_score_font_size,
             sg.BLACK,
-            (self.data['label_game_score_x'],
-             self.data['label_game_score_y'])
+            (self.data.label_game_score_x,
+             self.data.label_game_score_y)
         )
         # 直前のゲームのスコアを表示するラベルを作成
         self.label_game_mistake = Label(
-            f'失敗した回数：{game_mistake}回',
-            self.data['label_game_mistake_font_size'],
+            '',
+            self.data.label_game_mistake_font_size,
             sg.BLACK,
-            (self.data['label_game_mistake_x'],
-             self.data['label_game_mistake_y'])
+            (self.data.label_game_mistake_x,
+             self.data.label_game_mistake_y)
+        )
+        # 正答率の推移のグラフを作成
+        self.chart_accuracy = LineChart(
+            '正答率の推移',
+            [],
+            100,
+            (self.data.chart_accuracy_x,
+             self.data.chart_accuracy_y),
+            (self.data.chart_width,
+             self.data.chart_height),
+            self.data.chart_font_size,
+            sg.DASHBOARD_CHART_COLOR
+        )
+        # 品詞ごとの正答率のグラフを作成
+        self.chart_part_accuracy = BarChart(
+            '品詞ごとの正答率',
+            [],
+            100,
+            [],
+            (self.data.chart_part_accuracy_x,
+             self.data.chart_part_accuracy_y),
+            (self.data.chart_width,
+             self.data.chart_height),
+            self.data.chart_font_size,
+            sg.DASHBOARD_CHART_COLOR
+        )
+        # 回答時間の分布のグラフを作成
+        self.chart_response_time = BarChart(
+            '回答時間(秒)',
+            [],
+            1,
+            [],
+            (self.data.chart_response_time_x,
+             self.data.chart_response_time_y),
+            (self.data.chart_width,
+             self.data.chart_height),
+            self.data.chart_font_size,
+            sg.DASHBOARD_CHART_COLOR
         )
         # 「リトライ」ボタンを作成
         self.button_retry = Button(
-            (self.data['button_retry_x'],
-             self.data['button_retry_y']),
-            (self.data['button_retry_width'],
-             self.data['button_retry_height']),
+            (self.data.button_retry_x,
+             self.data.button_retry_y),
+            (self.data.button_retry_width,
+             self.data.button_retry_height),
             'リトライ',
             sg.BUTTON_COLOR,
             sg.BUTTON_HOVER_COLOR,
             sg.WHITE,
-            self.data['button_retry_font_size'],
+            self.data.button_retry_font_size,
             self.go_game_setting_screen,
             self.sound_player
         )
         # 「タイトルへ戻る」ボタンを作成
         self.button_back_title = Button(
-            (self.data['button_back_title_x'],
-             self.data['button_back_title_y']),
-            (self.data['button_back_title_width'],
-             self.data['button_back_title_height']),
+            (self.data.button_back_title_x,
+             self.data.button_back_title_y),
+            (self.data.button_back_title_width,
+             self.data.button_back_title_height),
             'タイトルへ戻る',
             sg.BUTTON_COLOR,
             sg.BUTTON_HOVER_COLOR,
             sg.WHITE,
-            self.data['button_back_title_font_size'],
+            self.data.button_back_title_font_size,
             self.go_title_screen,
             self.sound_player
         )
         self.EVENT_PARTS = [self.label_result,
                             self.label_game_score,
                             self.label_game_mistake,
+                            self.chart_accuracy,
+                            self.chart_part_accuracy,
+                            self.chart_response_time,
                             self.button_retry,
                             self.button_back_title,
                             ]
 
+    def on_enter(self, game_score, game_mistake, result_text, answer_log=()):
+        """
+        直前のゲームの結果を表示するメソッド
+
+        :param game_score: スコア
+        :param game_mistake: 失敗した回数
+        :param result_text: 結果の見出し
+        :param answer_log: 回答記録
+        """
+        self.label_result.update_text(result_text)
+        self.label_game_score.update_text(f'スコア：{game_score}点')
+        self.label_game_mistake.update_text(f'失敗した回数：{game_mistake}回')
+        # 回答記録をまとめて集計する
+        statistics = compute_statistics(answer_log)
+        self.chart_accuracy.set_data(statistics['accuracy'], 100)
+        self.chart_part_accuracy.set_data(statistics['part_accuracy'], 100, statistics['part_names'])
+        # 目盛りは各区間の始まりの秒数
+        self.chart_response_time.set_data(
+            statistics['time_counts'],
+            max(1, statistics['time_counts'].max()),
+            [f'{edge:g}' for edge in statistics['time_edges'][:-1].round(1)])
+
 
 class SystemSettingsScreen(BaseScreen):
     """ システム設定画面を作成するクラス """
 
-    def __init__(self, screen, change_screen_callback, sound_player):
-        super().__init__(screen, change_screen_callback, sound_player)
-        # 各settingsをtxtファイルから読み込み,辞書型のdata変数に格納
-        self.data = read_variable_file('settings/SystemSettingsScreen.txt')
+    def __init__(self, screen_manager):
+        super().__init__(screen_manager)
+        # 起動時に読み込んだsettingsのレイアウトを取得
+        self.data = get_layout('SystemSettingsScreen')
         # 戻るボタン
         self.button_back_title = ArrowButton(
             sg.BUTTON_BACK_POS,
@@ -1072,53 +1378,54 @@ class SystemSettingsScreen(BaseScreen):
         )
         self.label_volume = Label(
             '音量',
-            self.data['label_volume_font_size'],
+            self.data.label_volume_font_size,
             sg.BLACK,
-            (self.data['label_volume_x'],
-             self.data['label_volume_y'])
+            (self.data.label_volume_x,
+             self.data.label_volume_y)
         )
         self.label_se_volume = Label(
             'SE',
-            self.data['label_se_volume_font_size'],
+            self.data.label_se_volume_font_size,
             sg.BLACK,
-            (self.data['label_se_volume_x'],
-             self.data['label_se_volume_y'])
+            (self.data.label_se_volume_x,
+             self.data.label_se_volume_y)
         )
         # -ボタン
         self.button_se_volume_sub = Button(
-            (self.data['button_se_volume_sub_x'],
-             self.data['button_se_volume_sub_y']),
-            (self.data['button_se_volume_width'],
-             self.data['button_se_volume_height']),
+            (self.data.button_se_volume_sub_x,
+             self.data.button_se_volume_sub_y),
+            (self.data.button_se_volume_width,
+             self.data.button_se_volume_height),
             '-',
             sg.BLACK,
             sg.BLACK,
             sg.WHITE,
-            self.data['button_se_volume_font_size'],
+            self.data.button_se_volume_font_size,
             self.sound_player.sub_se_volume,
             self.sound_player
         )
         # +ボタン
         self.button_se_volume_add = Button(
-            (self.data['button_se_volume_add_x'],
-             self.data['button_se_volume_add_y']),
-            (self.data['button_se_volume_width'],
-             self.data['button_se_volume_height']),
+            (self.data.button_se_volume_add_x,
+             self.data.button_se_volume_add_y),
+            (self.data.button_se_volume_width,
+             self.data.button_se_volume_height),
             '+',
             sg.BLACK,
             sg.BLACK,
             sg.WHITE,
-            self.data['button_se_volume_font_size'],
+            self.data.button_se_volume_font_size,
             self.sound_player.add_se_volume,
             self.sound_player
         )
         # 設定音量ラベル
-        self.label_show_se_volume = Label(
-            '',
-            self.data['label_show_se_volume_font_size'],
+        self.label_show_se_volume = BoundLabel(
+            self.sound_player.get_se_volume,
+            str,
+            self.data.label_show_se_volume_font_size,
             sg.BLACK,
-            (self.data['label_show_se_volume_x'],
-             self.data['label_show_se_volume_y'])
+            (self.data.label_show_se_volume_x,
+             self.data.label_show_se_volume_y)
         )
         self.EVENT_PARTS = [self.button_back_title,
                             self.label_volume,
@@ -1127,13 +1434,7 @@ class SystemSettingsScreen(BaseScreen):
                             self.button_se_volume_add,
                             self.label_show_se_volume,
                             ]
-
-    def on_draw(self):
-        super().on_draw()
-        self.update_label()
-
-    def update_label(self):
-        self.label_show_se_volume.update_text(str(self.sound_player.get_se_volume()))
+        self.BOUND_PARTS = [self.label_show_se_volume]
 
 
 if __name__ == '__main__':
@@ -8,9 +8,48 @@ GRAY = (128, 128, 128)
 SCREEN_WIDTH = 640
 SCREEN_HEIGHT = 480
 
+# 起動時のウィンドウサイズ(座標はSCREEN_WIDTH x SCREEN_HEIGHTを基準に拡大縮小する)
+WINDOW_SIZE = (SCREEN_WIDTH, SCREEN_HEIGHT)
+
+# ウィンドウの大きさを変更できるかどうか
+WINDOW_RESIZABLE = True
+
 # 最大フレームレート
 FPS = 60
 
+# フォーカスが外れている間・最小化している間のフレームレート
+UNFOCUSED_FPS = 5
+
+# アニメーションがない間にイベントを待つ最大時間(ミリ秒)
+IDLE_WAIT_TIMEOUT = 500
+
+# 非フォーカス時に入力があってから通常のフレームレートで動かす時間(ミリ秒)
+INPUT_WAKE_TIME = 1000
+
+# 画面切り替えの演出('fade'、'slide'、演出しない場合はNone)
+TRANSITION_EFFECT = 'fade'
+
+# 画面切り替えの演出にかける時間(ミリ秒)
+TRANSITION_DURATION = 250
+
+# 次の問題を前もって描画するタスクの優先度(小さいほど先に進める)
+PREPARE_NEXT_QUESTION_PRIORITY = 10
+
+# 前もって作ったゲームの問題を描画するタスクの優先度
+PRELOAD_GAME_PRIORITY = 20
+
+# settings/*.txtを読み込んだ結果を保存しておくキャッシュ
+LAYOUT_CACHE_FILE = 'cache/layout.json'
+
+# 単語帳をバイナリ形式に変換して置いておくディレクトリ(Noneの場合はテキストから読み込む)
+BINARY_DECK_DIR = 'cache/vocabulary'
+
+# マウスの当たり判定に使うマスの大きさ(ピクセル)
+HIT_TEST_CELL_SIZE = 64
+
+# 変化した領域だけを再描画するかどうか(Falseなら毎フレーム画面全体を再描画する)
+DIRTY_RECT_RENDERING = True
+
 # 単語ごとの配列番号
 WORD_NUM = 0
 PART_NUM = 1
@@ -32,6 +71,66 @@ BUTTON_HOVER_COLOR = (150, 150, 150)
 # フォントファイルパス
 FONT_FILE_PATH = "font/ipaexg.ttf"
 
+# 描画済み文字列のキャッシュに使うメモリの上限(バイト)
+TEXT_CACHE_MAX_BYTES = 8 * 1024 * 1024
+
+# リストをマウスホイール1目盛りでスクロールする行数
+LIST_VIEW_WHEEL_ROWS = 3
+
+# 折り返した文字列を縮小する時の最小の文字の大きさ
+TEXT_LAYOUT_MIN_FONT_SIZE = 10
+
+# 折り返し結果・描画結果を記憶しておく最大数
+TEXT_LAYOUT_CACHE_SIZE = 512
+
+# 同時に存在できるパーティクルの最大数
+PARTICLE_MAX = 4096
+
+# 正解した時に放出するパーティクルの数
+PARTICLE_BURST_COUNT = 400
+
+# 正解した時のパーティクルの色
+PARTICLE_COLORS = ((255, 200, 0), (0, 200, 80), (80, 160, 255))
+
+# パーティクルの速さの範囲(論理解像度でのピクセル/秒)
+PARTICLE_SPEED = (60, 260)
+
+# パーティクルの寿命の範囲(秒)
+PARTICLE_LIFE = (0.4, 0.9)
+
+# パーティクルにかかる重力(論理解像度でのピクセル/秒^2)
+PARTICLE_GRAVITY = 400
+
+# パーティクル1つの大きさ(論理解像度でのピクセル)
+PARTICLE_SIZE = 3
+
+# 不正解の時に回答欄を揺らす幅(論理解像度でのピクセル)・時間(ミリ秒)・往復回数
+SHAKE_AMPLITUDE = 8
+SHAKE_DURATION = 300
+SHAKE_COUNT = 4
+
+# 結果画面のグラフの色・背景色
+DASHBOARD_CHART_COLOR = (0, 120, 215)
+DASHBOARD_BACKGROUND_COLOR = (240, 240, 240)
+
+# 結果画面のグラフの目盛りの文字の大きさ
+DASHBOARD_LABEL_FONT_SIZE = 10
+
+# 折れ線グラフの線の太さ
+DASHBOARD_LINE_WIDTH = 2
+
+# 棒グラフの1区間のうち棒が占める割合
+DASHBOARD_BAR_RATIO = 0.8
+
+# 回答時間の分布の区間の数
+DASHBOARD_HISTOGRAM_BINS = 8
+
+# グリフアトラスを保存するディレクトリ
+GLYPH_ATLAS_DIR = "cache/glyph_atlas"
+
+# グリフアトラスの横幅
+GLYPH_ATLAS_WIDTH = 1024
+
 # 戻るボタン
 BUTTON_BACK_TEXT = '戻る'
 BUTTON_BACK_POS = (45, 35)
@@ -1,21 +1,33 @@
 import pygame
+from dirty_rect import DirtyRectTracker
+from scaling import VIEWPORT
 
 
-class SubScreen:
+class SubScreen(DirtyRectTracker):
     def __init__(self, screen, sub_screen_size, sub_screen_color):
         """
         :param screen: スクリーン
         :param sub_screen_size: サブスクリーンの大きさ
         :param sub_screen_color: サブスクリーンの背景色
         """
+        super().__init__()
         self.screen = screen
         self.width = sub_screen_size[0]
         self.height = sub_screen_size[1]
+        self.sub_screen_color = sub_screen_color
         self.is_active = False
-        # サブスクリーンの作成
-        self.sub_screen = pygame.Surface((300, 200))
-        self.sub_screen.fill(sub_screen_color)
-        self.sub_screen_rect = self.sub_screen.get_rect(center=self.screen.get_rect().center)
+        self.relayout()
+
+    def relayout(self):
+        """ 現在の倍率に合わせた大きさでサブスクリーンを作り直すメソッド """
+        # サブスクリーンの作成(論理解像度の画面の中央に置く)
+        self.sub_screen = pygame.Surface(VIEWPORT.scale_size((self.width, self.height)))
+        self.sub_screen.fill(self.sub_screen_color)
+        self.sub_screen_rect = self.sub_screen.get_rect(center=VIEWPORT.get_logical_rect().center)
+
+    def get_rect(self):
+        """ 描画領域を返すメソッド """
+        return self.sub_screen_rect
 
     def draw(self, screen):
         if self.is_active:
@@ -27,10 +39,14 @@ class SubScreen:
         pass
 
     def is_active_true(self):
-        self.is_active = True
+        if not self.is_active:
+            self.is_active = True
+            self.mark_changed()
 
     def is_active_false(self):
-        self.is_active = False
+        if self.is_active:
+            self.is_active = False
+            self.mark_changed()
 
 
 class OnBorderSubScreen(SubScreen):
@@ -42,10 +58,64 @@ class OnBorderSubScreen(SubScreen):
         :param border_width: サブスクリーンの外枠の太さ
         :param border_color: サブスクリーンの外枠の色
         """
-        super().__init__(screen, sub_screen_size, sub_screen_color)
         self.border_width = border_width
         self.border_color = border_color
+        super().__init__(screen, sub_screen_size, sub_screen_color)
+
+    def relayout(self):
+        """ 現在の倍率に合わせてサブスクリーンと枠線を作り直すメソッド """
+        super().relayout()
         # 枠線の追加
-        border_width = self.border_width
+        border_width = VIEWPORT.scale_length(self.border_width)
         border_color = self.border_color
         pygame.draw.rect(self.sub_screen, border_color, self.sub_screen.get_rect(), border_width)
+
+
+class ModalOverlay:
+    """ 画面の上にダイアログを重ねて表示し、入力を独占するクラス """
+
+    def __init__(self, veil, dialog, parts):
+        """
+        :param veil: 下の画面を覆うSurface
+        :param dialog: ダイアログとして表示するSubScreen
+        :param parts: ダイアログ上に表示する部品のリスト
+        """
+        self.veil = veil
+        self.dialog = dialog
+        self.parts = parts
+        self.veil.is_active_true()
+        self.dialog.is_active_true()
+        # 下の画面・覆い・ダイアログを合成したサーフェス(開いている間だけ保持する)
+        self.backdrop = None
+
+    def open(self, snapshot):
+        """
+        オーバーレイを開くメソッド
+        :param snapshot: 開いた時点の下の画面(このサーフェスに合成する)
+        """
+        # 覆いとダイアログは開いた時に1回だけ合成する
+        self.veil.draw(snapshot)
+        self.dialog.draw(snapshot)
+        self.backdrop = snapshot
+        # 入力はEventRouterのレイヤーで独占するので、表示だけを切り替える
+        for parts in self.parts:
+            parts.is_draw_true()
+
+    def relayout(self):
+        """ 覆い・ダイアログ・ダイアログ上の部品の位置と大きさを計算し直すメソッド """
+        self.veil.relayout()
+        self.dialog.relayout()
+        for parts in self.parts:
+            parts.relayout()
+
+    def close(self):
+        """ オーバーレイを閉じるメソッド """
+        self.backdrop = None
+        for parts in self.parts:
+            parts.is_draw_false()
+
+    def draw(self, screen):
+        """ 描画処理を行うメソッド """
+        screen.blit(self.backdrop, (0, 0))
+        for parts in self.parts:
+            parts.draw(screen)
@@ -1,26 +1,47 @@
 import pygame
+from dirty_rect import DirtyRectTracker
+from scaling import VIEWPORT
 
 
-class Surface:
-    def __init__(self, surface_size, surface_color, surface_alpha):
+class Surface(DirtyRectTracker):
+    def __init__(self, surface_size, surface_color, surface_alpha, cover_window=False):
         """
 
         :param surface_size: 大きさ(width, height)
         :param surface_color: 色(r, g, b)
         :param surface_alpha: 透明度(0-255)
+        :param cover_window: 余白を含めたウィンドウ全体を覆うかどうか(Trueの場合surface_sizeは使わない)
         """
+        super().__init__()
         self.surface_width = surface_size[0]
         self.surface_height = surface_size[1]
         self.surface_color = surface_color
         self.surface_alpha = surface_alpha
+        self.cover_window = cover_window
         self.is_active = False
-        self.surface = pygame.Surface((self.surface_width, self.surface_height))
+        self.relayout()
+
+    def relayout(self):
+        """ 現在の倍率に合わせた大きさでサーフェスを作り直すメソッド """
+        if self.cover_window:
+            self.rect = pygame.Rect((0, 0), VIEWPORT.window_size)
+        else:
+            self.rect = VIEWPORT.scale_rect((0, 0), (self.surface_width, self.surface_height))
+        self.fill_surface()
+
+    def fill_surface(self):
+        """ self.rectの大きさでサーフェスを作るメソッド """
+        self.surface = pygame.Surface(self.rect.size)
         self.surface.set_alpha(self.surface_alpha)  # 透過度を設定
         self.surface.fill(self.surface_color)
 
     def draw(self, screen):
         if self.is_active:
-            screen.blit(self.surface, (0, 0))
+            # ウィンドウ全体を覆う場合は描画先の大きさに合わせて(0, 0)から覆う
+            if self.cover_window and self.rect.size != screen.get_size():
+                self.rect = screen.get_rect()
+                self.fill_surface()
+            screen.blit(self.surface, self.rect)
         else:
             pass
 
@@ -28,7 +49,11 @@ class Surface:
         pass
 
     def is_active_true(self):
-        self.is_active = True
+        if not self.is_active:
+            self.is_active = True
+            self.mark_changed()
 
     def is_active_false(self):
-        self.is_active = False
+        if self.is_active:
+            self.is_active = False
+            self.mark_changed()
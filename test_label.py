@@ -0,0 +1,26 @@
+import os
+import pygame
+import setting as sg
+from label import TextLayout
+
+# テストではpygameに同梱されているフォントを使う
+FONT_FILE = os.path.join(os.path.dirname(pygame.__file__), pygame.font.get_default_font())
+
+
+def setup_module():
+    pygame.font.init()
+
+
+def test_fit_below_min_font_size():
+    """ 最大の大きさが下限より小さい場合もその大きさで折り返す """
+    font_size = sg.TEXT_LAYOUT_MIN_FONT_SIZE - 1
+    size, lines = TextLayout(8).fit('accept the offer', FONT_FILE, font_size, (388, 19))
+    assert size == font_size
+    assert lines == ('accept the offer',)
+
+
+def test_fit_shrinks_to_min_font_size():
+    """ 収まらない場合は下限の大きさまで小さくする """
+    size, lines = TextLayout(8).fit('word ' * 50, FONT_FILE, 30, (100, 20))
+    assert size == sg.TEXT_LAYOUT_MIN_FONT_SIZE
+    assert len(lines) > 1
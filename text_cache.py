@@ -0,0 +1,111 @@
+import collections
+import setting as sg
+from font_registry import get_font
+
+
+class TextSurfaceCache:
+    """ 描画済みの文字列サーフェスをLRU方式で保持するクラス """
+
+    def __init__(self, max_bytes):
+        """
+        :param max_bytes: 保持するサーフェスの合計サイズの上限(バイト)
+        """
+        self.max_bytes = max_bytes
+        # (フォントファイル, 文字の大きさ, 内容, アンチエイリアス, 色)などをキーにしたサーフェス
+        self.surfaces = collections.OrderedDict()
+        # 保持しているサーフェスの合計サイズ(バイト)
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def render(self, font_file, font_size, text, antialias, color):
+        """
+        文字列を描画したサーフェスを返すメソッド
+        返されたサーフェスは共有されるため、変更してはいけない
+
+        :param font_file: フォントファイルのパス
+        :param font_size: 文字の大きさ
+        :param text: 描画する内容
+        :param antialias: アンチエイリアスの有無
+        :param color: 文字の色
+        :return: 描画済みのサーフェス
+        """
+        key = (font_file, font_size, text, antialias, tuple(color))
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = get_font(font_file, font_size).render(text, antialias, color)
+        self.add(key, surface)
+        return surface
+
+    def get_or_build(self, key, build, *args):
+        """
+        キーに対応するサーフェスを返し、なければbuildで作って保持するメソッド
+        返されたサーフェスは共有されるため、変更してはいけない
+
+        :param key: サーフェスを区別するキー(renderのキーと重ならないようにする)
+        :param build: サーフェスを作る関数
+        :param args: buildに渡す値
+        :return: サーフェス
+        """
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = build(*args)
+        self.add(key, surface)
+        return surface
+
+    def add(self, key, surface):
+        """ サーフェスを保持し、上限を超えた分を破棄するメソッド """
+        self.surfaces[key] = surface
+        self.current_bytes += self.get_surface_bytes(surface)
+        self.evict()
+
+    def evict(self):
+        """ 上限を超えた分を古いものから破棄するメソッド """
+        # 直近のサーフェスは上限を超えていても残す
+        while self.current_bytes > self.max_bytes and len(self.surfaces) > 1:
+            _, surface = self.surfaces.popitem(last=False)
+            self.current_bytes -= self.get_surface_bytes(surface)
+            self.evictions += 1
+
+    def clear(self):
+        """ 保持しているサーフェスをすべて破棄するメソッド """
+        self.surfaces.clear()
+        self.current_bytes = 0
+
+    def get_stats(self):
+        """ キャッシュの統計情報を返すメソッド """
+        return {
+            'entries': len(self.surfaces),
+            'bytes': self.current_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+    @staticmethod
+    def get_surface_bytes(surface):
+        """ サーフェスが使用するピクセルデータのサイズを返すメソッド """
+        return surface.get_pitch() * surface.get_height()
+
+
+# プロセス全体で共有するキャッシュ
+TEXT_CACHE = TextSurfaceCache(sg.TEXT_CACHE_MAX_BYTES)
+
+
+def render_text(font_file, font_size, text, antialias, color):
+    """ 共有キャッシュを通して文字列を描画する関数 """
+    return TEXT_CACHE.render(font_file, font_size, text, antialias, color)
+
+
+if __name__ == '__main__':
+    pass
@@ -1,8 +1,43 @@
 import setting as sg
 import pygame
+from dirty_rect import DirtyRectTracker
+from font_registry import get_font
+from scaling import VIEWPORT
 
+# (フォントファイル, 文字の大きさ, 文字, 色)をキーにした(描画済みの文字, 送り幅)
+GLYPH_CACHE = {}
+
+
+def get_glyph(font_file, font_size, char, color):
+    """
+    1文字分の描画済みサーフェスと送り幅を返す関数
+
+    :param font_file: フォントファイルのパス
+    :param font_size: 文字の大きさ
+    :param char: 文字
+    :param color: 文字の色
+    :return: (サーフェス, 送り幅)
+    """
+    key = (font_file, font_size, char, tuple(color))
+    glyph = GLYPH_CACHE.get(key)
+    if glyph is None:
+        font = get_font(font_file, font_size)
+        surface = font.render(char, True, color)
+        metrics = font.metrics(char)
+        if metrics and metrics[0] is not None:
+            advance = metrics[0][4]
+        else:
+            advance = surface.get_width()
+        glyph = (surface, advance)
+        GLYPH_CACHE[key] = glyph
+    return glyph
+
+
+class TextBox(DirtyRectTracker):
+
+    # キー入力だけを受け取る
+    EVENT_TYPES = (pygame.KEYDOWN,)
 
-class TextBox:
     def __init__(self, pos, box_size, font_size, box_color, text_color):
         """
 
@@ -12,13 +47,131 @@ class TextBox:
         :param box_color: テキストボックスの色
         :param text_color: 文字色
         """
-        self.rect = pygame.Rect(pos, box_size)
-        # 日本語フォントを使用する場合、フォントファイルのパスを指定する
-        self.font = pygame.font.Font(sg.FONT_FILE_PATH, font_size)
+        super().__init__()
+        # settingsに書かれた(論理解像度での)位置・大きさ・文字の大きさ
+        self.logical_pos = tuple(pos)
+        self.logical_size = tuple(box_size)
+        self.logical_font_size = font_size
         self.box_color = box_color
         self.text_color = text_color
-        self.text = ''
+        # 入力された文字のリスト
+        self.chars = []
+        # キャレットの位置(何文字目の前にあるか)
+        self.caret = 0
         self.is_active = True
+        self.relayout()
+
+    def relayout(self):
+        """ 現在の倍率に合わせて枠と文字を計算し直し、入力済みの行を描画し直すメソッド """
+        self.rect = VIEWPORT.scale_rect(self.logical_pos, self.logical_size)
+        # 枠と文字の間の余白・枠線の太さ
+        self.padding = VIEWPORT.scale_length(5)
+        self.border_width = VIEWPORT.scale_length(2)
+        # 日本語フォントを使用する場合、フォントファイルのパスを指定する
+        self.font_size = VIEWPORT.scale_font_size(self.logical_font_size)
+        self.font = get_font(sg.FONT_FILE_PATH, self.font_size)
+        # 各文字の描画開始位置(末尾は行全体の幅)
+        self.offsets = [0]
+        # 行の表示を開始する位置(横スクロール量)
+        self.scroll_x = 0
+        # 入力された行を描画したサーフェス(幅が足りなくなったら広げる)
+        self.line_height = self.font.get_height()
+        self.line_surface = pygame.Surface((self.rect.width * 2, self.line_height), pygame.SRCALPHA)
+        self.render_from(0)
+
+    def get_text_rect(self):
+        """ 文字を表示する領域を返すメソッド """
+        return pygame.Rect(self.rect.x + self.padding, self.rect.y + self.padding,
+                           self.rect.width - self.padding * 2, self.line_height)
+
+    def get_rect(self):
+        """ 枠からはみ出した文字を含めた描画領域を返すメソッド """
+        return self.rect.union(self.get_text_rect())
+
+    def set_text(self, new_text):
+        """
+        textを更新するメソッド
+        :param new_text: 新たに格納する内容
+        """
+        if self.get_text() == new_text:
+            return
+        self.chars = list(new_text)
+        self.caret = len(self.chars)
+        self.render_from(0)
+
+    def insert_char(self, char):
+        """
+        キャレットの位置に文字を挿入するメソッド
+        :param char: 挿入する文字
+        """
+        self.chars.insert(self.caret, char)
+        self.caret += 1
+        self.render_from(self.caret - 1)
+
+    def delete_char(self, index):
+        """
+        指定した位置の文字を削除するメソッド
+        :param index: 削除する文字の位置
+        """
+        if 0 <= index < len(self.chars):
+            del self.chars[index]
+            self.caret = min(self.caret, len(self.chars))
+            self.render_from(index)
+
+    def move_caret(self, new_caret):
+        """
+        キャレットを移動するメソッド(文字の再描画はしない)
+        :param new_caret: 移動先の位置
+        """
+        new_caret = max(0, min(new_caret, len(self.chars)))
+        if self.caret == new_caret:
+            return
+        self.caret = new_caret
+        self.scroll_to_caret()
+        self.mark_dirty()
+
+    def render_from(self, index):
+        """
+        指定した位置より後ろの文字だけを描画し直すメソッド
+        :param index: 描画し直す最初の文字の位置
+        """
+        # 送り幅から各文字の位置を計算し直す
+        del self.offsets[index + 1:]
+        for char in self.chars[index:]:
+            _, advance = get_glyph(sg.FONT_FILE_PATH, self.font_size, char, self.text_color)
+            self.offsets.append(self.offsets[-1] + advance)
+        self.reserve_line_width(self.offsets[-1] + self.font_size)
+        # 変化した部分だけを消して描画し直す
+        start_x = self.offsets[index]
+        self.line_surface.fill((0, 0, 0, 0), (start_x, 0, self.line_surface.get_width() - start_x, self.line_height))
+        for i in range(index, len(self.chars)):
+            glyph, _ = get_glyph(sg.FONT_FILE_PATH, self.font_size, self.chars[i], self.text_color)
+            self.line_surface.blit(glyph, (self.offsets[i], 0), special_flags=pygame.BLEND_RGBA_MAX)
+        self.scroll_to_caret()
+        self.mark_changed()
+
+    def reserve_line_width(self, width):
+        """
+        行のサーフェスの幅が足りない場合に広げるメソッド(描画済みの部分はそのまま使う)
+        :param width: 必要な幅
+        """
+        if width <= self.line_surface.get_width():
+            return
+        new_surface = pygame.Surface((max(width, self.line_surface.get_width() * 2), self.line_height),
+                                     pygame.SRCALPHA)
+        new_surface.blit(self.line_surface, (0, 0), special_flags=pygame.BLEND_RGBA_MAX)
+        self.line_surface = new_surface
+
+    def scroll_to_caret(self):
+        """ キャレットが表示領域に入るように横スクロールするメソッド """
+        visible_width = self.get_text_rect().width
+        caret_x = self.offsets[self.caret]
+        if caret_x < self.scroll_x:
+            self.scroll_x = caret_x
+        elif caret_x > self.scroll_x + visible_width - 1:
+            self.scroll_x = caret_x - visible_width + 1
+        # 末尾より後ろに余白ができないようにする
+        self.scroll_x = max(0, min(self.scroll_x, self.offsets[-1] - visible_width + 1))
 
     def handle_event(self, event):
         """ イベント処理を行うメソッド """
@@ -28,33 +181,59 @@ class TextBox:
                     # Enterキーを押した場合は何もしない
                     pass
                 elif event.key == pygame.K_BACKSPACE:
-                    self.text = self.text[:-1]
-                else:
-                    self.text += event.unicode
+                    self.delete_char(self.caret - 1)
+                elif event.key == pygame.K_DELETE:
+                    self.delete_char(self.caret)
+                elif event.key == pygame.K_LEFT:
+                    self.move_caret(self.caret - 1)
+                elif event.key == pygame.K_RIGHT:
+                    self.move_caret(self.caret + 1)
+                elif event.key == pygame.K_HOME:
+                    self.move_caret(0)
+                elif event.key == pygame.K_END:
+                    self.move_caret(len(self.chars))
+                elif event.unicode and event.unicode.isprintable():
+                    self.insert_char(event.unicode)
         else:
             pass
 
     def draw(self, screen):
         """ 描画処理を行うメソッド """
-        pygame.draw.rect(screen, self.box_color, self.rect, 2)
-        text_surface = self.font.render(self.text, True, self.text_color)
-        screen.blit(text_surface, (self.rect.x + 5, self.rect.y + 5))
+        pygame.draw.rect(screen, self.box_color, self.rect, self.border_width)
+        text_rect = self.get_text_rect()
+        # 描画済みの行から表示領域の分だけを切り出して描画する
+        screen.blit(self.line_surface, text_rect.topleft,
+                    (self.scroll_x, 0, text_rect.width, self.line_height))
+        if self.is_active:
+            caret_x = text_rect.x + self.offsets[self.caret] - self.scroll_x
+            pygame.draw.line(screen, self.text_color, (caret_x, text_rect.y),
+                             (caret_x, text_rect.bottom - 1))
+
+    def is_input_enabled(self):
+        """ 入力を受け付けている間だけキー入力を受け取る """
+        return self.is_active
 
     def get_text(self):
         """ textの中身を返すメソッド """
-        return self.text
+        return ''.join(self.chars)
 
     def clear_text(self):
         """ textの中身をクリアするメソッド """
-        self.text = ''
+        self.set_text('')
 
     def is_active_true(self):
         """ is_activeにTrueを格納するメソッド """
-        self.is_active = True
+        if not self.is_active:
+            self.is_active = True
+            self.mark_dirty()
+            self.notify_input_changed()
 
     def is_active_false(self):
         """ is_activeにFalseを格納するメソッド """
-        self.is_active = False
+        if self.is_active:
+            self.is_active = False
+            self.mark_dirty()
+            self.notify_input_changed()
 
 
 if __name__ == '__main__':
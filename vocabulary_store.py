@@ -0,0 +1,154 @@
+import glob
+import os
+import sys
+import threading
+from array import array
+from collections.abc import Sequence
+import setting as sg
+from read_file import read_deck_file
+from binary_deck import BinaryDeck, convert_deck, get_binary_deck_path
+
+
+class Deck(Sequence):
+    """
+    1つの単語帳を列ごとの配列(単語・品詞・意味)で保持するクラス
+    品詞は種類が少ないので、品詞の表に登録した番号だけを要素ごとに持つ
+    i番目の要素は(単語, 品詞, 意味)のタプルとして取り出せる
+    """
+
+    def __init__(self, words, part_ids, parts, meanings):
+        """
+        :param words: 単語のリスト
+        :param part_ids: 要素ごとの品詞の番号の配列
+        :param parts: 品詞の表(番号の順)
+        :param meanings: 意味のリスト
+        """
+        self.words = words
+        self.part_ids = part_ids
+        self.parts = parts
+        self.meanings = meanings
+
+    def __len__(self):
+        return len(self.words)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return self.words[index], self.parts[self.part_ids[index]], self.meanings[index]
+
+
+def parse_deck(file_name):
+    """
+    単語帳のファイル(1行に「単語,品詞,意味」)を読み込む関数
+
+    :param file_name: 単語帳のパス
+    :return: Deckクラスのインスタンス
+    """
+    words = []
+    part_ids = array('H')
+    parts = []
+    part_index = {}
+    meanings = []
+    for word, part, meaning in read_deck_file(file_name):
+        if part not in part_index:
+            part_index[part] = len(parts)
+            parts.append(sys.intern(part))
+        words.append(word)
+        part_ids.append(part_index[part])
+        meanings.append(meaning)
+    return Deck(words, part_ids, parts, meanings)
+
+
+class VocabularyStore:
+    """
+    難易度ごとの単語帳を1回だけ読み込んで共有するクラス
+    ファイルの更新時刻と大きさが変わった時だけ読み込み直す
+    バイナリ形式のディレクトリが指定されている場合は、変換したファイルをmmapで開いて使う
+    別スレッド(Preloader)からも使うのでロックをかけて読み込む
+    """
+
+    def __init__(self, vocabulary_dir, binary_dir=None):
+        """
+        :param vocabulary_dir: 単語帳のディレクトリ
+        :param binary_dir: バイナリ形式の単語帳のディレクトリ(Noneの場合はテキストから読み込む)
+        """
+        self.vocabulary_dir = vocabulary_dir
+        self.binary_dir = binary_dir
+        # 難易度をキーにした(更新時刻, 大きさ)とDeck
+        self.keys = {}
+        self.decks = {}
+        self.lock = threading.Lock()
+
+    def get_file_name(self, difficulty):
+        """ 難易度('EASY'など)に対応する単語帳のパスを返すメソッド(ファイル名は小文字) """
+        return os.path.join(self.vocabulary_dir, f'{difficulty.lower()}.txt')
+
+    def get_deck(self, difficulty):
+        """
+        難易度に対応する単語帳を返すメソッド(ファイルが変わっていれば読み込み直す)
+        :param difficulty: 難易度
+        :return: Deckクラスのインスタンス
+        """
+        file_name = self.get_file_name(difficulty)
+        with self.lock:
+            stat = os.stat(file_name)
+            key = (stat.st_mtime_ns, stat.st_size)
+            if self.keys.get(difficulty) != key:
+                self.decks[difficulty] = self.load_deck(difficulty, file_name, key)
+                self.keys[difficulty] = key
+            return self.decks[difficulty]
+
+    def load_deck(self, difficulty, file_name, key):
+        """
+        単語帳を読み込むメソッド
+        バイナリ形式がない・変換元と合わない場合は変換し直し、書き出せない場合はテキストから読み込む
+
+        :param difficulty: 難易度
+        :param file_name: テキスト形式の単語帳のパス
+        :param key: テキスト形式の単語帳の(更新時刻(ナノ秒), 大きさ)
+        :return: DeckまたはBinaryDeckクラスのインスタンス
+        """
+        if self.binary_dir is None:
+            return parse_deck(file_name)
+        # 変換元ごとに別のファイルにするので、渡した古い単語帳はそのまま使い続けられる
+        # (古いmmapは使う人がいなくなった時に解放される)
+        name = difficulty.lower()
+        bin_file = get_binary_deck_path(self.binary_dir, name, key)
+        try:
+            deck = BinaryDeck(bin_file)
+        except (OSError, ValueError):
+            deck = None
+        if deck is None or deck.source_key != key:
+            try:
+                convert_deck(file_name, bin_file)
+                deck = BinaryDeck(bin_file)
+            except OSError:
+                return parse_deck(file_name)
+        self.remove_old_binaries(name, bin_file)
+        return deck
+
+    def remove_old_binaries(self, name, bin_file):
+        """
+        古い変換元から書き出したバイナリ形式の単語帳を削除するメソッド
+        他で開いていて削除できないファイル(Windows)は次の機会に削除する
+        """
+        for path in glob.glob(os.path.join(self.binary_dir, f'{name}-*.deck')):
+            if os.path.normcase(path) == os.path.normcase(bin_file):
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+# プロセス全体で共有する単語帳
+VOCABULARY_STORE = VocabularyStore('vocabulary', sg.BINARY_DECK_DIR)
+
+
+def get_deck(difficulty):
+    """ 共有の単語帳を返す関数 """
+    return VOCABULARY_STORE.get_deck(difficulty)
+
+
+if __name__ == '__main__':
+    pass